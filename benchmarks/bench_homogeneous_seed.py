@@ -0,0 +1,62 @@
+"""
+Benchmark Seeder on a large homogeneous list of rows.
+
+Every row has the same key shape, so after the first row the compiled plan
+(sqlalchemyseed.plan) is a cache hit and the per-row cost is the model
+constructor itself.
+
+Run from the repository root:
+
+    python benchmarks/bench_homogeneous_seed.py
+"""
+
+import time
+
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from sqlalchemyseed import Seeder
+
+ROWS = 100_000
+
+Base = declarative_base()
+
+
+class Company(Base):
+    __tablename__ = "companies"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Employee(Base):
+    __tablename__ = "employees"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    email = Column(String(50))
+    company_id = Column(Integer, ForeignKey("companies.id"))
+    company = relationship(Company)
+
+
+def entities() -> dict:
+    return {
+        "model": "__main__.Employee",
+        "data": [
+            {"name": f"Employee {i}", "email": f"e{i}@example.com", "company_id": i % 10}
+            for i in range(ROWS)
+        ],
+    }
+
+
+def main():
+    data = entities()
+    seeder = Seeder()
+    start = time.perf_counter()
+    seeder.seed(data, add_to_session=False)
+    elapsed = time.perf_counter() - start
+    print(f"{ROWS} rows in {elapsed:.2f}s ({elapsed / ROWS * 1e6:.2f} us/row)")
+
+
+if __name__ == "__main__":
+    main()
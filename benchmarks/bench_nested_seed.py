@@ -0,0 +1,76 @@
+"""
+Benchmark Seeder traversal on deeply nested seed data.
+
+Each top-level row is a chain of ``depth`` nested children. With the stack
+based JsonWalker the time per seeded node stays flat as the depth grows;
+the previous walker re-walked the path from the root on every backward, so
+its time per node grew with the depth.
+
+Run from the repository root:
+
+    python benchmarks/bench_nested_seed.py
+"""
+
+import time
+
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from sqlalchemyseed import Seeder
+from sqlalchemyseed.json import JsonWalker
+
+Base = declarative_base()
+
+
+class Node(Base):
+    __tablename__ = "nodes"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    parent_id = Column(Integer, ForeignKey("nodes.id"))
+    children = relationship("Node")
+
+
+class RewalkingJsonWalker(JsonWalker):
+    """The previous backward(): re-walk the parent path from the root."""
+
+    def backward(self):
+        if len(self.path) == 0:
+            raise ValueError('No parent found error')
+        self._parents.pop()
+        self._current = self.find_from_root(self.path[:-1])
+        self.path.pop()
+
+
+def chain(depth: int) -> dict:
+    row = {"name": f"level {depth}"}
+    for level in range(depth - 1, 0, -1):
+        row = {"name": f"level {level}", "!children": [{"data": row}]}
+    return row
+
+
+def entities(rows: int, depth: int) -> dict:
+    return {"model": "__main__.Node", "data": [chain(depth) for _ in range(rows)]}
+
+
+def seconds_per_node(walker_class, rows: int, depth: int) -> float:
+    seeder = Seeder()
+    seeder._walker = walker_class()  # pylint: disable=protected-access
+    data = entities(rows, depth)
+    start = time.perf_counter()
+    seeder.seed(data, add_to_session=False)
+    return (time.perf_counter() - start) / (rows * depth)
+
+
+def main():
+    nodes = 20_000
+    print(f"{'depth':>5} {'stack (us/node)':>16} {'re-walk (us/node)':>18}")
+    for depth in (2, 5, 10, 20, 40):
+        rows = nodes // depth
+        stack = seconds_per_node(JsonWalker, rows, depth)
+        rewalk = seconds_per_node(RewalkingJsonWalker, rows, depth)
+        print(f"{depth:>5} {stack * 1e6:>16.2f} {rewalk * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
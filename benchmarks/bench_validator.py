@@ -0,0 +1,112 @@
+"""
+Benchmark schema validation of a large seed file.
+
+Validation does not touch the models, so the file only has to be shaped like
+a seed file. Half of the rows hold a nested reference. The iterative
+validator, shared through get_validator(), is timed against the previous
+recursive SchemaValidator, which built its Key instances and allowed key
+sets on every check.
+
+Run from the repository root:
+
+    python benchmarks/bench_validator.py
+"""
+
+import time
+
+from sqlalchemyseed import errors, util, validator
+from sqlalchemyseed.validator import Key
+
+ROWS = 1_000_000
+
+
+def check_model_key(entity: dict, entity_is_parent: bool):
+    model = Key.model()
+    if model not in entity and entity_is_parent:
+        raise errors.MissingKeyError("'model' key is missing.")
+    if model in entity and not model.is_valid_type(entity[model]):
+        raise errors.InvalidTypeError("'model' data should be 'string'.")
+
+
+def check_keys(entity: dict, source_keys: list):
+    allowed = {Key.model().name, *(key.name for key in source_keys)}
+    unknown = [key for key in entity if key not in allowed]
+    if unknown:
+        raise errors.InvalidKeyError(f"Unexpected key(s): {', '.join(map(str, unknown))}.")
+
+
+def check_source_key(entity: dict, source_keys: list) -> Key:
+    present = [key for key in source_keys if key in entity]
+    if len(present) != 1:
+        raise errors.InvalidKeyError(f"Expected exactly one of {', '.join(map(str, source_keys))}.")
+    return present[0]
+
+
+class RecursiveSchemaValidator:
+    """The previous validator: recurse into every list item and reference."""
+
+    def __init__(self, source_keys, ref_prefix):
+        self._source_keys = source_keys
+        self._ref_prefix = ref_prefix
+
+    def validate(self, entities):
+        self._pre_validate(entities, entity_is_parent=True)
+
+    def _pre_validate(self, entities, entity_is_parent=True):
+        if not isinstance(entities, dict) and not isinstance(entities, list):
+            raise errors.InvalidTypeError("Invalid type, should be list or dict")
+        if isinstance(entities, dict):
+            if len(entities) == 0 and entity_is_parent:
+                return
+            return self._validate(entities, entity_is_parent)
+        for entity in entities:
+            self._pre_validate(entity, entity_is_parent)
+
+    def _validate(self, entity: dict, entity_is_parent=True):
+        check_keys(entity, self._source_keys)
+        check_model_key(entity, entity_is_parent)
+        source_key = check_source_key(entity, self._source_keys)
+        source_data = entity[source_key]
+        validator.check_source_data(source_data, source_key)
+        if isinstance(source_data, list):
+            for item in source_data:
+                validator.check_data_type(item, source_key)
+                self.check_attributes(item)
+        else:
+            self.check_attributes(source_data)
+
+    def check_attributes(self, source_data: dict):
+        for attr_name in source_data:
+            if not isinstance(attr_name, str):
+                raise errors.InvalidTypeError(f"Invalid attribute name {attr_name!r}.")
+        for _, value in util.iter_ref_kwargs(source_data, self._ref_prefix):
+            self._pre_validate(value, entity_is_parent=False)
+
+
+def entities() -> dict:
+    return {
+        "model": "models.Company",
+        "data": [
+            {"name": f"Company {i}", "!employees": {"data": [{"name": f"E{i}"}]}}
+            if i % 2 else {"name": f"Company {i}"}
+            for i in range(ROWS)
+        ],
+    }
+
+
+def seconds(validate, data) -> float:
+    start = time.perf_counter()
+    validate(data)
+    return time.perf_counter() - start
+
+
+def main():
+    data = entities()
+    iterative = seconds(validator.validate, data)
+    recursive = seconds(RecursiveSchemaValidator([Key.data()], "!").validate, data)
+    for name, elapsed in (("iterative", iterative), ("recursive", recursive)):
+        print(f"{name:>9}: {ROWS} rows in {elapsed:.2f}s ({elapsed / ROWS * 1e6:.2f} us/row)")
+
+
+if __name__ == "__main__":
+    main()
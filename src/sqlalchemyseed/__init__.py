@@ -4,9 +4,12 @@ SQLAlchemy seeder that supports nested relationships with an easy to read text f
 
 from .seeder import HybridSeeder
 from .seeder import Seeder
+from .diff import DiffSeeder
 from .loader import load_entities_from_json
 from .loader import load_entities_from_yaml
 from .loader import load_entities_from_csv
+from .loader import stream_entities_from_json
+from .loader import stream_entities_from_csv
 from . import util
 from . import attribute
 
@@ -0,0 +1,5 @@
+"""
+Experimental APIs that may change without a deprecation period.
+"""
+
+from ..plan import compile_plan
@@ -5,39 +5,234 @@ These bridge the existing sync-only seeder logic onto an ``AsyncSession``
 using :meth:`~sqlalchemy.ext.asyncio.AsyncSession.run_sync`, which runs the
 sync code inside a greenlet where the driver's blocking I/O is translated
 into ``await`` calls.
-No parallel async reimplementation of the traversal is needed.
+
+In bulk mode, :class:`AsyncSeeder` doesn't use ``run_sync``. The sync
+:class:`Seeder` generates the steps of the seed (see
+:meth:`Seeder.bulk_steps`), which need no I/O, and each one is awaited on
+the session's ``AsyncConnection``, returning control to the event loop
+between batches.
+
+``AsyncHybridSeeder(session, max_concurrency=N)`` collects the ``filter``
+lookups of a seed in ``run_sync`` and queries them concurrently over up to
+``N`` extra sessions before assigning the results.
 """
 
-from typing import Union
+import asyncio
+import time
+from itertools import islice
+from typing import Iterable, Optional, Union
 
-from sqlalchemy.ext.asyncio import AsyncSession
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 
+from . import bulk, validator
+from .constants import DATA_KEY
 from .seeder import HybridSeeder, Seeder
 
 
+def iter_chunks(entities, chunk_size: int):
+    """
+    Yield the entities in lists holding up to ``chunk_size`` top-level rows,
+    splitting the 'data' of an entity across lists where needed.
+    """
+    chunk, size = [], 0
+    for entity in [entities] if isinstance(entities, dict) else entities:
+        data = entity.get(DATA_KEY) if isinstance(entity, dict) else None
+        if not (isinstance(data, list) and data) and not validator.is_stream(data):
+            # a single row, or an entity left as is for validation to report
+            chunk.append(entity)
+            size += 1
+        else:
+            rows = iter(data)
+            while part := list(islice(rows, chunk_size - size)):
+                chunk.append({**entity, DATA_KEY: part})
+                size += len(part)
+                if size >= chunk_size:
+                    yield chunk
+                    chunk, size = [], 0
+        if size >= chunk_size:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
 class AsyncSeeder:
     """Async counterpart of :class:`~sqlalchemyseed.seeder.Seeder`.
 
-    ``strict`` is forwarded as-is to the wrapped sync :class:`Seeder`.
+    ``strict`` and the bulk options ``mode``, ``batch_size``,
+    ``on_conflict``, ``conflict_keys`` as well as ``convert`` are forwarded
+    as-is to the wrapped sync :class:`Seeder`, whose bulk counts are
+    reported by ``row_counts``. In bulk mode, the steps it generates are
+    awaited one by one on the session's ``AsyncConnection``.
     """
 
-    def __init__(self, session: AsyncSession, ref_prefix: str = "!", strict: bool = False):
+    def __init__(self, session: AsyncSession, ref_prefix: str = "!", strict: bool = False,
+                 mode: str = "orm", batch_size: int = bulk.DEFAULT_BATCH_SIZE,
+                 on_conflict: Optional[str] = None, conflict_keys: Union[list, dict, None] = None,
+                 convert: bool = False):
         self.session = session
         self.ref_prefix = ref_prefix
         self.strict = strict
-        self._seeder: Seeder = None
+        self.mode = mode
+        self.batch_size = batch_size
+        self.on_conflict = on_conflict
+        self.conflict_keys = conflict_keys
+        self.convert = convert
+        self._instances: list = []
+        self._row_counts: dict = {}
+        self._max_stall = 0.0
+        # reject invalid options now rather than on the first seed
+        self._make_seeder(None)
+
+    def _make_seeder(self, sync_session) -> Seeder:
+        return Seeder(sync_session, ref_prefix=self.ref_prefix, strict=self.strict, mode=self.mode,
+                      batch_size=self.batch_size, on_conflict=self.on_conflict,
+                      conflict_keys=self.conflict_keys, convert=self.convert)
+
+    async def seed(self, entities: Union[list, dict, Iterable], add_to_session: bool = True,
+                   chunk_size: Optional[int] = None, single_pass: bool = False):
+        """
+        With ``chunk_size``, the top-level rows of the entities are seeded
+        ``chunk_size`` at a time, each chunk in its own ``run_sync`` call,
+        returning control to the event loop between chunks. Each chunk is
+        validated as it is seeded, and the chunks run in a SAVEPOINT that
+        is rolled back if one fails. ``max_stall`` reports the longest
+        ``run_sync`` call, to tune ``chunk_size`` by.
+
+        In bulk mode, control returns to the event loop after every batch
+        instead, so ``chunk_size`` isn't supported; ``max_stall`` reports
+        the longest time taken to build a batch.
+
+        ``single_pass`` is forwarded to :meth:`Seeder.seed`.
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size should be a positive integer")
+        if chunk_size is not None and self.mode == "bulk":
+            raise ValueError("bulk mode returns to the event loop between batches, chunk_size isn't supported")
+        if self.mode == "bulk" and not add_to_session:
+            raise ValueError("bulk mode writes rows directly and requires add_to_session=True")
+        self._instances.clear()
+        self._row_counts.clear()
+        self._max_stall = 0.0
 
-    async def seed(self, entities: Union[list, dict], add_to_session: bool = True):
+        if self.mode == "bulk":
+            if single_pass:
+                async with self.session.begin_nested():
+                    await self._seed_bulk(entities, single_pass)
+            else:
+                await self._seed_bulk(entities, single_pass)
+        elif chunk_size is None:
+            await self._seed_sync(entities, add_to_session, single_pass)
+        elif add_to_session:
+            async with self.session.begin_nested():
+                await self._seed_chunks(entities, add_to_session, chunk_size, single_pass)
+        else:
+            await self._seed_chunks(entities, add_to_session, chunk_size, single_pass)
+
+    async def _seed_bulk(self, entities, single_pass):
+        connection = await self.session.connection()
+        seeder = self._make_seeder(self.session.sync_session)
+        steps = seeder.bulk_steps(entities, connection.dialect, single_pass=single_pass)
+        while True:
+            start = time.perf_counter()
+            step = next(steps, None)
+            self._max_stall = max(self._max_stall, time.perf_counter() - start)
+            if step is None:
+                break
+            if isinstance(step, bulk.Flush):
+                # entities bulk mode can't express, seeded through the ORM
+                self.session.add_all(step.instances)
+                await self.session.flush()
+            else:
+                result = await connection.execute(step.statement, step.params)
+                if step.apply is not None:
+                    step.apply(result)
+            await asyncio.sleep(0)
+
+        self._instances.extend(seeder.instances)
+        self._row_counts.update(seeder.row_counts)
+
+    async def _seed_chunks(self, entities, add_to_session, chunk_size, single_pass):
+        for chunk in iter_chunks(entities, chunk_size):
+            await self._seed_sync(chunk, add_to_session, single_pass)
+            await asyncio.sleep(0)
+
+    async def _seed_sync(self, entities, add_to_session, single_pass):
         def _run(sync_session):
-            seeder = Seeder(sync_session, ref_prefix=self.ref_prefix, strict=self.strict)
-            seeder.seed(entities, add_to_session=add_to_session)
+            seeder = self._make_seeder(sync_session)
+            seeder.seed(entities, add_to_session=add_to_session, single_pass=single_pass)
             return seeder
 
-        self._seeder = await self.session.run_sync(_run)
+        start = time.perf_counter()
+        seeder = await self.session.run_sync(_run)
+        self._max_stall = max(self._max_stall, time.perf_counter() - start)
+        self._instances.extend(seeder.instances)
+        for table_name, count in seeder.row_counts.items():
+            self._row_counts[table_name] = self._row_counts.get(table_name, 0) + count
 
     @property
     def instances(self) -> tuple:
-        return self._seeder.instances if self._seeder is not None else ()
+        return tuple(self._instances)
+
+    @property
+    def max_stall(self) -> float:
+        """
+        Returns the longest time, in seconds, that a single ``run_sync``
+        call, or the building of a bulk batch, of the last seed held the
+        event loop
+        """
+        return self._max_stall
+
+    @property
+    def row_counts(self) -> dict:
+        """
+        Returns the number of bulk inserted rows, keyed by table name
+        """
+        return dict(self._row_counts)
+
+
+class _ConcurrentHybridSeeder(HybridSeeder):
+    """
+    HybridSeeder that, with ``collect``, leaves deferred filters of tables
+    untouched by the run to be looked up by the caller, in ``collected``.
+    """
+
+    def __init__(self, session, ref_prefix, strict, collect=True):
+        super().__init__(session, ref_prefix=ref_prefix, strict=strict, batch_filters=True)
+        self.collect = collect
+        self.collected = {}
+        self._written_tables = set()
+
+    def _setup_data_instance(self, class_, filtered_kwargs, parent):
+        instance = super()._setup_data_instance(class_, filtered_kwargs, parent)
+        self._written_tables.update(sqlalchemy.inspect(class_).tables)
+        return instance
+
+    def _resolve_pending_filters(self):
+        # filters that may match rows of this run need the seeding session
+        self.collected.clear()
+        for key in list(self._pending_filters) if self.collect else ():
+            target = self._pending_filters[key][0].target
+            table = target.table if isinstance(target, sqlalchemy.Column) else sqlalchemy.inspect(target).local_table
+            if table not in self._written_tables:
+                self.collected[key] = self._pending_filters.pop(key)
+        super()._resolve_pending_filters()
+
+    def assign_collected(self, rows: dict):
+        """
+        Assign the results of the collected filters, given the rows each
+        filter's query returned.
+        """
+        for key, pending_filters in self.collected.items():
+            target = pending_filters[0].target
+            results = [row[0] for row in rows[key]]
+            if len(results) == 1 and not isinstance(target, sqlalchemy.Column):
+                # an instance loaded by another session
+                results = [self.session.merge(results[0], load=False)]
+            self._assign_filter_results(pending_filters, results)
+        self.collected.clear()
 
 
 class AsyncHybridSeeder:
@@ -48,15 +243,35 @@ class AsyncHybridSeeder:
     a real sync ``Session`` whose queries are proxied to the async driver.
 
     ``strict`` is forwarded as-is to the wrapped sync :class:`HybridSeeder`.
+
+    With ``max_concurrency``, filters are collected while the entities are
+    walked, and the distinct filters of tables the seed doesn't write are
+    queried concurrently over up to ``max_concurrency`` sessions of the same
+    engine, which see committed rows only. A filter with no or more than one
+    match there is queried again on ``session``, which raises as usual.
+    Filters of tables the seed writes are resolved on ``session`` as with
+    ``batch_filters``. Engines whose pool shares one connection, such as an
+    in-memory SQLite database, a ``session`` bound to a connection rather
+    than an engine, and a ``session`` that was already in a transaction
+    before ``seed``, whose changes other sessions can't see, resolve every
+    filter on ``session``.
     """
 
-    def __init__(self, session: AsyncSession, ref_prefix: str = "!", strict: bool = False):
+    def __init__(self, session: AsyncSession, ref_prefix: str = "!", strict: bool = False,
+                 max_concurrency: Optional[int] = None):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency should be None or a positive integer")
         self.session = session
         self.ref_prefix = ref_prefix
         self.strict = strict
+        self.max_concurrency = max_concurrency
         self._seeder: HybridSeeder = None
 
     async def seed(self, entities: Union[list, dict]):
+        if self.max_concurrency is not None:
+            await self._seed_concurrent(entities)
+            return
+
         def _run(sync_session):
             seeder = HybridSeeder(sync_session, ref_prefix=self.ref_prefix, strict=self.strict)
             seeder.seed(entities)
@@ -64,6 +279,59 @@ class AsyncHybridSeeder:
 
         self._seeder = await self.session.run_sync(_run)
 
+    async def _seed_concurrent(self, entities):
+        engine = self._lookup_engine()
+
+        def _walk(sync_session):
+            seeder = _ConcurrentHybridSeeder(sync_session, self.ref_prefix, self.strict,
+                                             collect=engine is not None)
+            seeder.seed(entities)
+            return seeder
+
+        seeder = await self.session.run_sync(_walk)
+        self._seeder = seeder
+        if not seeder.collected:
+            return
+
+        sessions = asyncio.Queue()
+        for _ in range(min(self.max_concurrency, len(seeder.collected))):
+            sessions.put_nowait(AsyncSession(engine))
+        try:
+            keys = list(seeder.collected)
+            rows = await asyncio.gather(*(
+                self._query(sessions, seeder.collected[key][0]) for key in keys
+            ))
+            await self.session.run_sync(lambda _: seeder.assign_collected(dict(zip(keys, rows))))
+        finally:
+            while not sessions.empty():
+                await sessions.get_nowait().close()
+
+    def _lookup_engine(self):
+        """
+        Returns the engine to open lookup sessions on, or None if the
+        session is in a transaction or bound to a connection, whose changes
+        other sessions can't see, or the engine's connections can't be used
+        independently of the session's.
+        """
+        if self.session.in_transaction():
+            return None
+        engine = self.session.bind
+        if not isinstance(engine, AsyncEngine):
+            return None
+        if isinstance(engine.sync_engine.pool, (StaticPool, SingletonThreadPool)):
+            return None
+        return engine
+
+    @staticmethod
+    async def _query(sessions: asyncio.Queue, pending) -> list:
+        session = await sessions.get()
+        try:
+            result = await session.execute(sqlalchemy.select(pending.target).filter_by(**pending.kwargs))
+            # two rows are enough to tell a single match from many
+            return result.fetchmany(2)
+        finally:
+            sessions.put_nowait(session)
+
     @property
     def instances(self) -> tuple:
         return self._seeder.instances if self._seeder is not None else ()
@@ -5,13 +5,80 @@ attribute module containing helper functions for instrumented attribute.
 import warnings
 from functools import lru_cache
 from inspect import isclass
+from typing import NamedTuple
 
-from sqlalchemy.orm import ColumnProperty, RelationshipProperty
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ColumnProperty, Mapper, RelationshipProperty
 from sqlalchemy.orm.attributes import InstrumentedAttribute, get_attribute, set_attribute
 
 from . import errors
 
 
+class MapperInfo(NamedTuple):
+    """
+    Attribute classification of a mapped class.
+    """
+    column_keys: frozenset
+    relationship_keys: frozenset
+    # relationship keys with uselist=True
+    uselist_keys: frozenset
+    # attribute key to table column key
+    table_keys: dict
+    # attribute keys of the primary key columns, in identity order
+    primary_key: tuple
+
+
+_mapper_infos = {}
+
+
+def mapper_info(class_) -> MapperInfo:
+    """
+    Returns the cached attribute classification of a mapped class.
+
+    The cache is cleared whenever mappers are (re)configured, e.g. when a
+    new registry or mapped class appears.
+    """
+    try:
+        return _mapper_infos[class_]
+    except KeyError:
+        pass
+
+    mapper = inspect(class_)
+    info = MapperInfo(
+        column_keys=frozenset(prop.key for prop in mapper.column_attrs),
+        relationship_keys=frozenset(prop.key for prop in mapper.relationships),
+        uselist_keys=frozenset(prop.key for prop in mapper.relationships if prop.uselist),
+        table_keys={prop.key: prop.columns[0].key for prop in mapper.column_attrs},
+        primary_key=tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key),
+    )
+    _mapper_infos[class_] = info
+    return info
+
+
+def clear_caches():
+    """
+    Clears the cached attribute lookups.
+    """
+    _mapper_infos.clear()
+    foreign_key_column.cache_clear()
+    referenced_class.cache_clear()
+
+
+def is_relationship_key(class_, key: str) -> bool:
+    """
+    Check if key names a relationship attribute of the class.
+
+    Raises AttributeError if key is not an attribute of the class.
+    """
+    info = mapper_info(class_)
+    if key in info.relationship_keys:
+        return True
+    if key in info.column_keys:
+        return False
+    # not a mapped attribute, e.g. a synonym or a plain descriptor
+    return attr_is_relationship(instrumented_attribute(class_, key))
+
+
 def instrumented_attribute(class_or_instance, key: str):
     """
     Returns instrumented attribute from the class or instance.
@@ -42,9 +109,7 @@ def set_instance_attribute(instance, key, value):
     Set attribute value of instance
     """
 
-    instr_attr: InstrumentedAttribute = getattr(instance.__class__, key)
-
-    if attr_is_relationship(instr_attr) and instr_attr.property.uselist:
+    if key in mapper_info(instance.__class__).uselist_keys:
         get_attribute(instance, key).append(value)
     else:
         set_attribute(instance, key, value)
@@ -64,11 +129,19 @@ def check_scalar_cardinality(instance, attr_name, value, strict=False):
     ``{"!company": {"data": [{...}, {...}]}}``), which remains out of scope
     for gap #4.
     """
-    instr_attr = instrumented_attribute(instance, attr_name)
-    if not attr_is_relationship(instr_attr):
+    class_ = instance if isclass(instance) else instance.__class__
+    if not is_relationship_key(class_, attr_name):
         return
-    if instr_attr.property.uselist:
+    if attr_name in mapper_info(class_).uselist_keys:
         return
+    check_scalar_value(attr_name, value, strict)
+
+
+def check_scalar_value(attr_name, value, strict=False):
+    """
+    Warn, or raise if ``strict``, when ``value`` given to the scalar
+    relationship ``attr_name`` is a list of more than one item.
+    """
     if not isinstance(value, list) or len(value) <= 1:
         return
     message = (
@@ -102,3 +175,6 @@ def referenced_class(instrumented_attr: InstrumentedAttribute):
         lambda mapper: mapper.class_.__tablename__ == table_name,
         instrumented_attr.parent.registry.mappers
     )).class_
+
+
+event.listen(Mapper, "after_configured", clear_caches)
@@ -0,0 +1,487 @@
+"""
+Bulk module used by ``Seeder(session, mode="bulk")``.
+
+Rows are written as Core ``insert(Table)`` executemany batches, which
+SQLAlchemy 2.0 sends through its "insertmanyvalues" path. No ORM instances
+are constructed, so model ``__init__`` logic and ORM-only defaults are
+bypassed.
+
+Nested entities are collected into a :class:`BulkGraph`: one node per row,
+with an edge wherever a row needs a key of another row (a foreign key, or
+both sides of a many-to-many association row). The graph is then inserted in
+waves; each wave holds the rows whose keys are all known, and is written
+with one executemany per table and key set. Keys generated by the database
+are read back with ``RETURNING`` and copied into the dependent rows before
+the next wave.
+
+With a :class:`Conflict`, rows that conflict with existing rows are skipped
+or update them, using the dialect's ``INSERT ... ON CONFLICT`` (SQLite,
+PostgreSQL) or ``ON DUPLICATE KEY UPDATE`` (MySQL, MariaDB). Since
+``RETURNING`` has no row for a skipped insert, the keys dependent rows need
+are then selected back by the conflict target instead.
+
+Inserts are described as :class:`Step` and :class:`Flush` items rather than
+executed here, so that :func:`run_steps` can run them on a ``Session`` and
+``AsyncSeeder`` can await them on an ``AsyncConnection``.
+"""
+
+from itertools import islice
+from typing import Callable, Iterable, NamedTuple, Optional, Union
+
+import sqlalchemy
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import RelationshipDirection
+
+from . import util
+from .attribute import (attr_is_relationship, check_scalar_cardinality, instrumented_attribute,
+                        mapper_info)
+from .constants import DATA_KEY, MODEL_KEY
+
+DEFAULT_BATCH_SIZE = 1000
+ON_CONFLICT_ACTIONS = ("ignore", "update")
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+}
+
+
+def supports_bulk(class_) -> bool:
+    """
+    Check if the mapped class maps a single table without inheritance.
+    """
+    mapper = inspect(class_)
+    return mapper.inherits is None and mapper.polymorphic_on is None
+
+
+def iter_source_rows(entity: dict):
+    """
+    Iterate the rows of an entity's 'data' value, which is a dict or a list.
+    """
+    source_data = entity[DATA_KEY]
+    if isinstance(source_data, dict):
+        yield source_data
+    else:
+        yield from source_data
+
+
+def is_flat_entity(entity: dict, ref_prefix: str) -> bool:
+    """
+    Check if no row of the entity holds a reference key.
+    """
+    return not any(
+        str(key).startswith(ref_prefix)
+        for row in iter_source_rows(entity)
+        for key in row
+    )
+
+
+def to_row(class_, kwargs: dict) -> dict:
+    """
+    Convert constructor kwargs into a row keyed by column key.
+
+    Raises TypeError for unknown keys, as the default model constructor does.
+    """
+    keys = mapper_info(class_).table_keys
+    try:
+        return {keys[key]: value for key, value in kwargs.items()}
+    except KeyError as error:
+        raise TypeError(
+            f"{error.args[0]!r} is an invalid keyword argument for {class_.__name__}"
+        ) from None
+
+
+class Conflict(NamedTuple):
+    """
+    How inserts handle rows that conflict with existing rows: ``action`` is
+    "ignore" or "update".
+
+    ``keys`` are the column keys of the conflict target, either a list used
+    for every table that has those columns, or a dict of such lists keyed by
+    table name. A table without given keys uses its first unique constraint
+    or unique index whose columns are all in the inserted rows, or else its
+    primary key.
+    """
+    action: str
+    keys: Union[list, dict, None] = None
+
+    def target(self, table, shape: frozenset) -> tuple:
+        """
+        Returns the column keys of the conflict target of rows with the shape.
+        """
+        keys = self.keys
+        if isinstance(keys, dict):
+            keys = keys.get(table.name)
+        if keys is not None and all(key in table.c for key in keys):
+            return tuple(keys)
+
+        column_sets = [
+            constraint.columns for constraint in table.constraints
+            if isinstance(constraint, sqlalchemy.UniqueConstraint)
+        ]
+        # a partial or expression index can't be named by its columns alone
+        column_sets.extend(
+            index.columns for index in table.indexes
+            if index.unique and len(index.columns) == len(index.expressions)
+            and not any(value is not None for key, value in index.dialect_kwargs.items() if key.endswith("_where"))
+        )
+        candidates = sorted(tuple(sorted(column.key for column in columns)) for columns in column_sets)
+        for candidate in candidates:
+            if shape.issuperset(candidate):
+                return candidate
+        return tuple(column.key for column in table.primary_key)
+
+    def statement(self, table, dialect, shape: frozenset):
+        """
+        Returns the insert statement of rows with the shape.
+        """
+        try:
+            insert = _DIALECT_INSERTS[dialect.name]
+        except KeyError:
+            raise ValueError(f"on_conflict is not supported by the {dialect.name} dialect") from None
+
+        target = self.target(table, shape)
+        statement = insert(table)
+        updates = sorted(shape.difference(target)) if self.action == "update" else []
+        if insert is mysql.insert:
+            if updates:
+                return statement.on_duplicate_key_update({key: statement.inserted[key] for key in updates})
+            # a no-op update rather than INSERT IGNORE, which ignores other errors too
+            column = next(iter(table.primary_key))
+            return statement.on_duplicate_key_update({column.key: column})
+        if updates:
+            return statement.on_conflict_do_update(
+                index_elements=target, set_={key: statement.excluded[key] for key in updates},
+            )
+        return statement.on_conflict_do_nothing(index_elements=target)
+
+
+class Step(NamedTuple):
+    """
+    A statement to execute, and the function to pass its result to.
+    """
+    statement: sqlalchemy.Executable
+    params: Union[list, dict, None] = None
+    apply: Optional[Callable] = None
+
+
+class Flush(NamedTuple):
+    """
+    ORM instances to add to the session and flush.
+    """
+    instances: list
+
+
+def run_steps(session, steps: Iterable[Union[Step, Flush]]):
+    """
+    Run the steps through the session, in order.
+    """
+    for step in steps:
+        if isinstance(step, Flush):
+            session.add_all(step.instances)
+            session.flush()
+            continue
+        result = session.execute(step.statement, step.params)
+        if step.apply is not None:
+            step.apply(result)
+
+
+def insert_rows(session, class_, rows: Iterable[dict], batch_size=DEFAULT_BATCH_SIZE,
+                conflict: Conflict = None) -> int:
+    """
+    Insert rows into the table of the class in executemany batches.
+    Returns the number of inserted rows, including any skipped or updating
+    a conflicting row.
+    """
+    count = 0
+    for statement, group in insert_batches(class_, session.get_bind().dialect, rows, batch_size, conflict):
+        session.execute(statement, group)
+        count += len(group)
+    return count
+
+
+def insert_batches(class_, dialect, rows: Iterable[dict], batch_size=DEFAULT_BATCH_SIZE,
+                   conflict: Conflict = None):
+    """
+    Yield the insert statement and parameters of each executemany of rows
+    into the table of the class. Rows are read lazily, a batch at a time.
+    """
+    table = inspect(class_).local_table
+    statement = sqlalchemy.insert(table)
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        for group in group_by_shape(batch):
+            if conflict is not None:
+                statement = conflict.statement(table, dialect, frozenset(group[0]))
+            yield statement, group
+
+
+def group_by_shape(rows: list) -> list:
+    """
+    Group rows by their key set, since an executemany needs uniform keys.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return list(groups.values())
+
+
+class UnsupportedEntity(Exception):
+    """Raised when an entity can't be bulk seeded and needs the ORM"""
+
+
+class _Node:
+    """
+    A row waiting to be inserted.
+    """
+    __slots__ = ("table", "values", "waiting", "dependents")
+
+    def __init__(self, table, values: dict):
+        self.table = table
+        self.values = values
+        # number of column values still to be copied from other rows
+        self.waiting = 0
+        # (source column key, dependent node, dependent column key)
+        self.dependents = []
+
+    def depend_on(self, source: "_Node", pairs):
+        """
+        Copy source columns into this node's columns once source is inserted.
+        """
+        for source_column, column in pairs:
+            source.dependents.append((source_column.key, self, column.key))
+            self.waiting += 1
+
+
+class Batch(NamedTuple):
+    """
+    An insert statement and its parameters, ready to be executed.
+    """
+    statement: sqlalchemy.Insert
+    params: list
+    nodes: list
+    returning: tuple
+    # with a conflict clause, the conflict target to select the returning
+    # columns back by, instead of using RETURNING
+    select_by: tuple = ()
+
+    def apply(self, result):
+        """
+        Copy the returned keys into the inserted nodes.
+        """
+        if not self.returning:
+            return
+        if isinstance(self.params, dict):
+            rows = [result.one()] if result.returns_rows else [result.inserted_primary_key]
+        else:
+            rows = result.all()
+        for node, row in zip(self.nodes, rows):
+            node.values.update(zip(self.returning, row))
+
+    def select_back(self) -> sqlalchemy.Select:
+        """
+        Returns the select of the returning columns of the inserted nodes
+        by their values of the select_by columns.
+        """
+        table = self.statement.table
+        columns = [table.c[key] for key in self.select_by]
+        values = [tuple(node.values[key] for key in self.select_by) for node in self.nodes]
+        if len(columns) == 1:
+            condition = columns[0].in_([value for value, in values])
+        else:
+            condition = sqlalchemy.tuple_(*columns).in_(values)
+        return sqlalchemy.select(*columns, *(table.c[key] for key in self.returning)).where(condition)
+
+    def apply_selected(self, result):
+        """
+        Copy the rows of the select_back result into the inserted nodes.
+        """
+        size = len(self.select_by)
+        found = {tuple(row[:size]): row[size:] for row in result}
+        for node in self.nodes:
+            value = tuple(node.values[key] for key in self.select_by)
+            node.values.update(zip(self.returning, found[value]))
+
+    def steps(self):
+        """
+        Yield the steps that insert the batch and copy the keys back.
+        """
+        if not self.select_by:
+            yield Step(self.statement, self.params, self.apply)
+            return
+        yield Step(self.statement, self.params)
+        yield Step(self.select_back(), apply=self.apply_selected)
+
+
+class BulkGraph:
+    """
+    Rows of nested entities and the keys they share.
+
+    ``kwargs_filter`` is called as ``kwargs_filter(kwargs, class_)`` and
+    returns the column kwargs of a row. If given, ``validate`` is called as
+    ``validate(value, False)`` on each reference value before it is added.
+    With a ``conflict``, inserts use its conflict clause.
+    """
+
+    def __init__(self, kwargs_filter: Callable, ref_prefix="!", strict=False,
+                 validate: Callable = None, conflict: Conflict = None):
+        self.kwargs_filter = kwargs_filter
+        self.ref_prefix = ref_prefix
+        self.strict = strict
+        self.validate = validate
+        self.conflict = conflict
+        self.row_counts = {}
+        self._nodes = []
+
+    def add(self, entity):
+        """
+        Add the rows of a top-level entity.
+
+        Raises UnsupportedEntity, leaving the graph unchanged, when the
+        entity holds a class or reference that bulk seeding can't express.
+        """
+        size = len(self._nodes)
+        try:
+            self._add_entity(entity)
+        except UnsupportedEntity:
+            del self._nodes[size:]
+            raise
+
+    def _add_entity(self, entity, parent=None, prop=None):
+        # expected entity is [{'model': ...}, ...] or {'model': ...}
+        if isinstance(entity, list):
+            for item in entity:
+                self._add_entity(item, parent, prop)
+            return
+
+        if MODEL_KEY in entity:
+            class_ = util.get_model_class(entity[MODEL_KEY])
+        else:
+            class_ = prop.mapper.class_
+
+        if not supports_bulk(class_):
+            raise UnsupportedEntity(f"{class_.__name__} maps more than one table")
+
+        for kwargs in iter_source_rows(entity):
+            node = self._add_node(class_, kwargs)
+            if parent is not None:
+                self._link(parent, prop, node)
+
+    def _add_node(self, class_, kwargs: dict) -> _Node:
+        table = inspect(class_).local_table
+        node = _Node(table, to_row(class_, self.kwargs_filter(kwargs, class_)))
+        self._nodes.append(node)
+
+        for attr_name, value in util.iter_ref_kwargs(kwargs, self.ref_prefix):
+            instr_attr = instrumented_attribute(class_, attr_name)
+            if not attr_is_relationship(instr_attr):
+                raise UnsupportedEntity(f"{attr_name!r} is not a relationship attribute")
+            check_scalar_cardinality(class_, attr_name, value, self.strict)
+            if self.validate is not None:
+                self.validate(value, False)
+            self._add_entity(value, node, instr_attr.property)
+
+        return node
+
+    def _link(self, parent: _Node, prop, child: _Node):
+        if prop.direction is RelationshipDirection.ONETOMANY:
+            child.depend_on(parent, prop.synchronize_pairs)
+        elif prop.direction is RelationshipDirection.MANYTOONE:
+            parent.depend_on(child, prop.synchronize_pairs)
+        else:  # MANYTOMANY
+            association = _Node(prop.secondary, {})
+            association.depend_on(parent, prop.synchronize_pairs)
+            association.depend_on(child, prop.secondary_synchronize_pairs)
+            self._nodes.append(association)
+
+    def batches(self, dialect, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Yield the insert batches in dependency order.
+
+        Each batch must be executed and applied before the next one is
+        requested, since later rows are filled from the returned keys.
+        """
+        ready = [node for node in self._nodes if node.waiting == 0]
+        while ready:
+            groups = {}
+            for node in ready:
+                groups.setdefault((node.table, frozenset(node.values)), []).append(node)
+
+            ready = []
+            for (table, shape), nodes in groups.items():
+                yield from self._group_batches(table, shape, nodes, dialect, batch_size)
+                self._count(table, len(nodes))
+                ready.extend(self._release(nodes))
+
+        self._nodes.clear()
+
+    def _group_batches(self, table, shape, nodes, dialect, batch_size):
+        returning = tuple(sorted({
+            key for node in nodes for key, _, _ in node.dependents if key not in shape
+        }))
+
+        if self.conflict is not None:
+            statement = self.conflict.statement(table, dialect, shape)
+            select_by = self.conflict.target(table, shape) if returning else ()
+            if not shape.issuperset(select_by):
+                raise ValueError(
+                    f"rows of {table.name!r} need values for {', '.join(select_by)} "
+                    "to read back their keys with on_conflict"
+                )
+            for index in range(0, len(nodes), batch_size):
+                chunk = nodes[index:index + batch_size]
+                yield Batch(statement, [node.values for node in chunk], chunk, returning, select_by)
+            return
+
+        statement = sqlalchemy.insert(table)
+        if not returning:
+            for index in range(0, len(nodes), batch_size):
+                chunk = nodes[index:index + batch_size]
+                yield Batch(statement, [node.values for node in chunk], chunk, ())
+            return
+
+        columns = [table.c[key] for key in returning]
+        if getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False):
+            statement = statement.returning(*columns, sort_by_parameter_order=True)
+            for index in range(0, len(nodes), batch_size):
+                chunk = nodes[index:index + batch_size]
+                yield Batch(statement, [node.values for node in chunk], chunk, returning)
+            return
+
+        # one row at a time; without RETURNING only primary keys come back
+        if dialect.insert_returning:
+            statement = statement.returning(*columns)
+        else:
+            returning = tuple(column.key for column in table.primary_key)
+        for node in nodes:
+            yield Batch(statement, node.values, [node], returning)
+
+    def _count(self, table, count):
+        self.row_counts[table.name] = self.row_counts.get(table.name, 0) + count
+
+    @staticmethod
+    def _release(nodes):
+        for node in nodes:
+            for key, dependent, dependent_key in node.dependents:
+                dependent.values[dependent_key] = node.values[key]
+                dependent.waiting -= 1
+                if dependent.waiting == 0:
+                    yield dependent
+
+
+def graph_steps(graph: BulkGraph, dialect, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield the steps that insert the rows of the graph. Each step must be
+    run before the next one is requested.
+    """
+    for batch in graph.batches(dialect, batch_size):
+        yield from batch.steps()
+
+
+def execute(session, graph: BulkGraph, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert the rows of the graph through the session.
+    """
+    run_steps(session, graph_steps(graph, session.get_bind().dialect, batch_size))
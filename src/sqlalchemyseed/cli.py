@@ -3,12 +3,16 @@
 import argparse
 import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 import sqlalchemy
 from sqlalchemy.orm import Session
 
-from . import loader
+from . import loader, validator
+from .manifest import Manifest, file_hash
 from .seeder import HybridSeeder, Seeder
 
 
@@ -43,6 +47,18 @@ def build_parser() -> argparse.ArgumentParser:
         default="!",
         help="prefix marking relationship references (default: !)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="parse and validate files in N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="store_true",
+        help="record file hashes in a manifest table and skip files unchanged since they were seeded",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -93,13 +109,71 @@ def _make_seeder(name, session, ref_prefix):
     return Seeder(session, ref_prefix=ref_prefix)
 
 
-def _seed_all(seeder, files, model) -> int:
-    """Seed every file through the seeder and return the entity count."""
+def _seed_all(seeder, files, model, manifest: Manifest = None, jobs=1) -> tuple:
+    """Seed every file through the seeder and return the entity and file counts.
+
+    With a manifest, files whose content hash is unchanged since they were
+    seeded are skipped without being loaded. With more than one job, files
+    are parsed and validated in worker processes while this process seeds
+    them, still one at a time and in order. Files are validated once, before
+    they are seeded.
+    """
+    digests = {}
+    if manifest is not None:
+        changed = []
+        for path in files:
+            digest = digests[path] = file_hash(path)
+            if manifest.is_current(path, digest):
+                print(f"Skipped unchanged file: {path}")
+            else:
+                changed.append(path)
+        files = changed
+
     seeded = 0
-    for path in files:
-        seeder.seed(loader.load_path(path, model))
+    hybrid = isinstance(seeder, HybridSeeder)
+    for path, entities in zip(files, _load_files(files, model, hybrid, seeder.ref_prefix, jobs)):
+        seeder.seed(entities, validate=False)
         seeded += len(seeder.instances)
-    return seeded
+        if manifest is not None:
+            manifest.record(path, digests[path])
+    return seeded, len(files)
+
+
+def _load_files(files, model, hybrid, ref_prefix, jobs):
+    """Yield the validated entities of each file in order, loading ahead in a process pool.
+
+    At most ``jobs + 1`` files are loaded ahead of the one being seeded, so
+    memory grows with a few files rather than with all of them.
+    """
+    if jobs <= 1 or len(files) <= 1:
+        for path in files:
+            yield _load_file(path, model, hybrid, ref_prefix)
+        return
+
+    paths = iter(files)
+    executor = ProcessPoolExecutor(max_workers=min(jobs, len(files)))
+    try:
+        pending = deque(
+            executor.submit(_load_file, path, model, hybrid, ref_prefix) for path in islice(paths, jobs + 1)
+        )
+        while pending:
+            entities = pending.popleft().result()
+            for path in islice(paths, 1):
+                pending.append(executor.submit(_load_file, path, model, hybrid, ref_prefix))
+            yield entities
+    finally:
+        # stop loading ahead once a file fails to seed
+        executor.shutdown(cancel_futures=True)
+
+
+def _load_file(path, model, hybrid, ref_prefix):
+    """Load and validate a file; runs in a worker process with --jobs."""
+    entities = loader.load_path(path, model)
+    if hybrid:
+        validator.hybrid_validate(entities, ref_prefix=ref_prefix)
+    else:
+        validator.validate(entities, ref_prefix=ref_prefix)
+    return entities
 
 
 def main(argv=None) -> int:
@@ -115,6 +189,9 @@ def main(argv=None) -> int:
     # resolve against the current working directory.
     sys.path.insert(0, os.getcwd())
 
+    if args.jobs < 1:
+        parser.error("--jobs should be a positive integer")
+
     try:
         files = collect_files(args.paths)
     except FileNotFoundError as error:
@@ -124,8 +201,9 @@ def main(argv=None) -> int:
         engine = sqlalchemy.create_engine(url)
         with Session(engine) as session:
             seeder = _make_seeder(args.seeder, session, args.ref_prefix)
-            seeded = _seed_all(seeder, files, args.model)
-            return _finish(session, seeded, len(files), args.dry_run)
+            manifest = Manifest(session) if args.manifest else None
+            seeded, file_count = _seed_all(seeder, files, args.model, manifest, args.jobs)
+            return _finish(session, seeded, file_count, args.dry_run)
     except Exception as error:  # noqa: BLE001 - top-level boundary: report any failure as exit code 1
         if args.debug:
             raise
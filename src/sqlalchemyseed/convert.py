@@ -0,0 +1,171 @@
+"""
+Convert module.
+
+Converts text values, such as the cells of a csv file, to the Python types
+of the mapped columns they are seeded into. A converter is compiled once
+per column from its type, and once per (class, key shape) for a row, so a
+large file is converted without inspecting the mapper or guessing types
+per row.
+
+Values decoded from json or yaml are already typed, except for the types
+json has no literal for. Their converters, compiled from each column's
+``python_type``, only parse the strings of date, datetime, time, Decimal and
+UUID columns, and leave other values as they are.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+from functools import lru_cache
+from typing import Callable, Optional
+
+import sqlalchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Mapper
+
+from . import errors
+
+_TRUE = frozenset(("true", "t", "yes", "y", "on", "1"))
+_FALSE = frozenset(("false", "f", "no", "n", "off", "0"))
+
+
+def parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_datetime(value: str) -> datetime:
+    # fromisoformat of Python < 3.11 doesn't read a 'Z' offset
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def type_parser(type_) -> Optional[Callable[[str], object]]:
+    """
+    Returns the function that parses text into a value of the column type,
+    or None if the text is used as is.
+    """
+    if isinstance(type_, sqlalchemy.Boolean):
+        return parse_bool
+    if isinstance(type_, sqlalchemy.Integer):
+        return int
+    # Float derives from Numeric before SQLAlchemy 2.1 only
+    if isinstance(type_, (sqlalchemy.Numeric, sqlalchemy.Float)):
+        return Decimal if type_.asdecimal else float
+    if isinstance(type_, sqlalchemy.DateTime):
+        return parse_datetime
+    if isinstance(type_, sqlalchemy.Date):
+        return date.fromisoformat
+    if isinstance(type_, sqlalchemy.Time):
+        return time.fromisoformat
+    if isinstance(type_, sqlalchemy.Uuid) and type_.as_uuid:
+        return UUID
+    return None
+
+
+# parsers of the strings standing in for values json has no literal for
+_VALUE_PARSERS = {
+    datetime: parse_datetime,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+    Decimal: Decimal,
+    UUID: UUID,
+}
+
+
+def column_converter(column) -> Optional[Callable[[str], object]]:
+    """
+    Returns the converter of text values of the column, or None if the text
+    is used as is. An empty value of a nullable column converts to None.
+    """
+    parse = type_parser(column.type)
+    if parse is None:
+        return None
+    if not column.nullable:
+        return parse
+
+    def convert(value):
+        return None if value == "" else parse(value)
+
+    return convert
+
+
+def value_converter(column) -> Optional[Callable[[object], object]]:
+    """
+    Returns the converter of decoded json or yaml values of the column, or
+    None if its values need no conversion. Strings are parsed, an empty one
+    of a nullable column as None, a float of a Decimal column is converted
+    by its shortest repr, and other values are left as they are.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    parse = _VALUE_PARSERS.get(python_type)
+    if parse is None:
+        return None
+    nullable = column.nullable
+
+    def convert(value):
+        if isinstance(value, str):
+            return None if nullable and value == "" else parse(value)
+        if python_type is Decimal and isinstance(value, float):
+            return Decimal(repr(value))
+        return value
+
+    return convert
+
+
+@lru_cache(maxsize=1024)
+def get_row_converter(class_, key_shape: tuple, text=True) -> Callable[[dict], dict]:
+    """
+    Returns the cached function that converts the values of a row of
+    class_ whose keys are key_shape, in place. Keys that aren't column
+    attributes, such as references, and None values are left as they are.
+
+    With ``text``, every value is text to convert (see
+    :func:`column_converter`); otherwise values are decoded json or yaml
+    (see :func:`value_converter`).
+    """
+    compile_converter = column_converter if text else value_converter
+    mapper = inspect(class_)
+    converters = []
+    for key in key_shape:
+        prop = mapper.column_attrs.get(key) if isinstance(key, str) else None
+        if prop is None:
+            continue
+        converter = compile_converter(prop.columns[0])
+        if converter is not None:
+            converters.append((key, converter))
+    converters = tuple(converters)
+
+    def convert_row(row: dict) -> dict:
+        for key, converter in converters:
+            value = row[key]
+            if value is None:
+                continue
+            try:
+                row[key] = converter(value)
+            except (ValueError, ArithmeticError) as error:
+                raise errors.ParseError(
+                    f"Invalid value {value!r} for {class_.__name__}.{key}: {error}"
+                ) from error
+        return row
+
+    return convert_row
+
+
+def convert_row(class_, row: dict, text=True) -> dict:
+    """
+    Convert the values of a row of class_ in place, and return it.
+    """
+    return get_row_converter(class_, tuple(row), text)(row)
+
+
+# converters hold the column types, which change with the mappers
+event.listen(Mapper, "after_configured", get_row_converter.cache_clear)
@@ -0,0 +1,292 @@
+"""
+Diff module.
+
+:class:`DiffSeeder` brings tables in line with seed files by writing only
+what differs. The rows of an entity are sorted by key and merged against the
+table, read in the same key order through a ``yield_per`` cursor, so the
+table is never loaded as a whole. Seed values are first converted to what
+reading them back yields, e.g. dates given as strings, so that an unchanged
+row compares equal. String keys are ordered by their bytes, as
+Python orders them, whatever the collation of their columns. Inserts,
+updates and deletes are collected during the merge and written as
+executemany batches once the read is finished, so no write runs while the
+cursor is open, and a table the database orders differently than Python is
+rejected before anything is written.
+"""
+
+from decimal import Decimal
+from typing import Callable, NamedTuple, Optional
+
+import sqlalchemy
+from sqlalchemy import bindparam, inspect
+
+from . import bulk, errors, util, validator
+from .attribute import mapper_info
+from .constants import MODEL_KEY
+from .convert import value_converter
+from .plan import get_plan
+
+
+class DiffCounts(NamedTuple):
+    """
+    Rows written, or left unchanged, by a diff of a table.
+    """
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def __add__(self, other):
+        return DiffCounts(*(a + b for a, b in zip(self, other)))
+
+
+class DiffSeeder:
+    """
+    Seeds flat entities by inserting, updating and, with ``delete``,
+    deleting rows so that each table matches its seed rows.
+
+    Rows are matched by ``key``, a list of attribute names that every seed
+    row holds, or by the primary key. Only the columns present in the seed
+    rows are compared and updated. With ``delete=True``, rows of the table
+    that no seed row matches are deleted.
+
+    References aren't supported; seed nested entities with :class:`Seeder`.
+    """
+
+    def __init__(self, session: sqlalchemy.orm.Session, key: list = None, delete=False,
+                 batch_size=bulk.DEFAULT_BATCH_SIZE, ref_prefix="!", strict=False):
+        self.session = session
+        self.key = key
+        self.delete = delete
+        self.batch_size = batch_size
+        self.ref_prefix = ref_prefix
+        self.strict = strict
+        self._counts = {}
+
+    @property
+    def counts(self) -> dict:
+        """
+        Returns the DiffCounts of the last seed, keyed by table name
+        """
+        return dict(self._counts)
+
+    def seed(self, entities) -> dict:
+        """
+        Diff the entities against their tables and write the differences.
+        Returns the counts, as :attr:`counts` does.
+        """
+        validator.validate(entities=entities, ref_prefix=self.ref_prefix)
+        self._counts.clear()
+        for entity in entities if isinstance(entities, list) else [entities]:
+            if entity:
+                self._seed_entity(entity)
+        return self.counts
+
+    def _seed_entity(self, entity: dict):
+        class_ = util.get_model_class(entity[MODEL_KEY])
+        table = inspect(class_).local_table
+        table_keys = mapper_info(class_).table_keys
+        key_columns = tuple(table_keys[name] for name in self.key or mapper_info(class_).primary_key)
+
+        normalizers = {}
+        rows = {}
+        for kwargs in bulk.iter_source_rows(entity):
+            plan = get_plan(class_, tuple(kwargs), self.ref_prefix)
+            if plan.references:
+                raise ValueError(f"DiffSeeder doesn't support references, found {plan.references[0].key!r}")
+            row = bulk.to_row(class_, plan.kwargs(kwargs, self.strict))
+            normalize_row(table, row, normalizers)
+            try:
+                row_key = tuple(row[column] for column in key_columns)
+            except KeyError as error:
+                raise ValueError(f"seed rows of {table.name!r} need a value for {error.args[0]!r}") from None
+            if row_key in rows:
+                raise ValueError(f"duplicate key {row_key!r} in the seed rows of {table.name!r}")
+            rows[row_key] = row
+
+        compared = sorted({column for row in rows.values() for column in row}.difference(key_columns))
+        writer = _Writer(self.session, table, key_columns, self.batch_size)
+        counts = writer.merge(sorted(rows.items()), compared, self.delete)
+        self._counts[table.name] = self._counts.get(table.name, DiffCounts()) + counts
+
+
+def column_normalizer(column) -> Optional[Callable[[object], object]]:
+    """
+    Returns the function that converts a seed value of the column to the
+    value reading it back yields, or None if values are compared as they
+    are. Strings of date, datetime, time, Decimal and UUID columns are
+    parsed (see :func:`~sqlalchemyseed.convert.value_converter`), and
+    numbers of a Numeric column with a scale are rounded to it.
+    """
+    convert = value_converter(column)
+    type_ = column.type
+    # Float derives from Numeric before SQLAlchemy 2.1 only
+    if (not isinstance(type_, sqlalchemy.Numeric) or isinstance(type_, sqlalchemy.Float)
+            or not type_.asdecimal or type_.scale is None):
+        return convert
+    exponent = Decimal(1).scaleb(-type_.scale)
+
+    def normalize(value):
+        value = convert(value)
+        if isinstance(value, (Decimal, int)) and not isinstance(value, bool):
+            return Decimal(value).quantize(exponent)
+        return value
+
+    return normalize
+
+
+def normalize_row(table, row: dict, normalizers: dict) -> dict:
+    """
+    Normalize the values of a row of the table in place, with the
+    normalizers of its columns cached in ``normalizers``.
+    """
+    for key, value in row.items():
+        if value is None:
+            continue
+        try:
+            normalize = normalizers[key]
+        except KeyError:
+            normalize = normalizers[key] = column_normalizer(table.c[key])
+        if normalize is None:
+            continue
+        try:
+            row[key] = normalize(value)
+        except (ValueError, ArithmeticError) as error:
+            raise errors.ParseError(f"Invalid value {value!r} for {table.name}.{key}: {error}") from error
+    return row
+
+
+class _Writer:
+    """
+    Merges sorted seed rows against a table and batches the writes.
+    """
+
+    def __init__(self, session, table, key_columns: tuple, batch_size):
+        self.session = session
+        self.table = table
+        self.key_columns = key_columns
+        self.batch_size = batch_size
+        self._inserts = []
+        self._updates = []
+        self._deletes = []
+
+    def merge(self, rows: list, compared: list, delete: bool) -> DiffCounts:
+        table = self.table
+        keys = [table.c[column] for column in self.key_columns]
+        dialect = self.session.get_bind().dialect
+        statement = (
+            sqlalchemy.select(*keys, *(table.c[column] for column in compared))
+            .order_by(*(binary_order(key, dialect) for key in keys))
+            .execution_options(yield_per=self.batch_size)
+        )
+        size = len(keys)
+        inserted = updated = deleted = unchanged = 0
+        existing = iter(self.session.execute(statement))
+        current = self._next(existing, None)
+
+        for row_key, row in rows:
+            while current is not None and current[:size] < row_key:
+                if delete:
+                    self._delete(current[:size])
+                    deleted += 1
+                current = self._next(existing, current)
+
+            if current is not None and current[:size] == row_key:
+                values = dict(zip(compared, current[size:]))
+                if any(values[column] != value for column, value in row.items() if column in values):
+                    self._update(row)
+                    updated += 1
+                else:
+                    unchanged += 1
+                current = self._next(existing, current)
+            else:
+                self._insert(row)
+                inserted += 1
+
+        while current is not None:
+            if delete:
+                self._delete(current[:size])
+                deleted += 1
+            current = self._next(existing, current)
+
+        self._write_inserts()
+        self._write_updates()
+        self._write_deletes()
+        return DiffCounts(inserted, updated, deleted, unchanged)
+
+    def _next(self, existing, previous):
+        current = next(existing, None)
+        size = len(self.key_columns)
+        if current is not None and previous is not None and not previous[:size] < current[:size]:
+            raise ValueError(
+                f"the database orders the keys of {self.table.name!r} differently than Python, "
+                f"{tuple(previous[:size])!r} came before {tuple(current[:size])!r}"
+            )
+        return current
+
+    def _insert(self, row):
+        self._inserts.append(row)
+
+    def _update(self, row):
+        self._updates.append(row)
+
+    def _delete(self, row_key):
+        self._deletes.append(tuple(row_key))
+
+    def _batches(self, rows: list):
+        for index in range(0, len(rows), self.batch_size):
+            yield rows[index:index + self.batch_size]
+
+    def _write_inserts(self):
+        for batch in self._batches(self._inserts):
+            for group in bulk.group_by_shape(batch):
+                self.session.execute(sqlalchemy.insert(self.table), group)
+        self._inserts.clear()
+
+    def _write_updates(self):
+        table = self.table
+        # bind names that can't clash with the column names of the values
+        condition = sqlalchemy.and_(*(
+            table.c[column] == bindparam(f"_key_{column}") for column in self.key_columns
+        ))
+        for batch in self._batches(self._updates):
+            for group in bulk.group_by_shape(batch):
+                columns = [column for column in group[0] if column not in self.key_columns]
+                statement = sqlalchemy.update(table).where(condition).values(
+                    {column: bindparam(column) for column in columns}
+                )
+                params = [
+                    {**{column: row[column] for column in columns},
+                     **{f"_key_{column}": row[column] for column in self.key_columns}}
+                    for row in group
+                ]
+                self.session.execute(statement, params)
+        self._updates.clear()
+
+    def _write_deletes(self):
+        keys = [self.table.c[column] for column in self.key_columns]
+        for batch in self._batches(self._deletes):
+            if len(keys) == 1:
+                condition = keys[0].in_([row_key for row_key, in batch])
+            else:
+                condition = sqlalchemy.tuple_(*keys).in_(batch)
+            self.session.execute(sqlalchemy.delete(self.table).where(condition))
+        self._deletes.clear()
+
+
+def binary_order(column, dialect):
+    """
+    Returns the expression to order a key column by so that the database
+    orders its strings by code point, as Python does, rather than by the
+    collation of the column. Other columns, and strings on dialects without
+    a known binary collation, are ordered as they are.
+    """
+    if not isinstance(column.type, sqlalchemy.String):
+        return column
+    if dialect.name == "sqlite":
+        return column.collate("BINARY")
+    if dialect.name == "postgresql":
+        return column.collate("C")
+    if dialect.name in ("mysql", "mariadb"):
+        return sqlalchemy.cast(column, sqlalchemy.LargeBinary)
+    return column
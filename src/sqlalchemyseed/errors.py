@@ -38,3 +38,14 @@ class NotInModuleError(Exception):
 
 class InvalidModelPath(Exception):
     """Raised when an invalid model path is invoked"""
+
+
+class ComponentSeedError(Exception):
+    """Raised when seeding components of entities fails"""
+
+    def __init__(self, failures: dict):
+        # table names of each failed component -> its exception
+        self.failures = failures
+        super().__init__("; ".join(
+            f"{', '.join(tables)}: {error!r}" for tables, error in failures.items()
+        ))
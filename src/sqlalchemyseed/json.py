@@ -4,12 +4,16 @@ from typing import Callable, List, Union
 class JsonWalker:
     """
     JsonWalker class
+
+    Keeps a stack of the parent nodes of the current json, so moving
+    backward is O(1) instead of a re-walk from the root.
     """
 
     def __init__(self, json: Union[list, dict] = None) -> None:
         self.path = []
         self.root = json
         self._current = json
+        self._parents = []
 
     @property
     def json(self):
@@ -46,7 +50,12 @@ class JsonWalker:
         if len(keys) == 0:
             return self._current
 
-        self._current = self.find_from_current(keys)
+        nodes = [self._current]
+        for key in keys:
+            nodes.append(nodes[-1][key])
+
+        self._current = nodes.pop()
+        self._parents.extend(nodes)
         self.path.extend(keys)
         return self._current
 
@@ -58,8 +67,9 @@ class JsonWalker:
         if len(self.path) == 0:
             raise ValueError('No parent found error')
 
-        self._current = self.find_from_root(self.path[:-1])
+        self._current = self._parents.pop()
         self.path.pop()
+        return self._current
 
     def find_from_current(self, keys: List[Union[int, str]]):
         """
@@ -89,6 +99,7 @@ class JsonWalker:
 
         self._current = self.root
         self.path.clear()
+        self._parents.clear()
 
     def exec_func_iter(self, func: Callable):
         """
@@ -4,9 +4,15 @@ Text file loader module
 
 import csv
 import json
+import re
 import sys
+from collections import deque
 from pathlib import Path
 
+from . import errors, util
+from .constants import DATA_KEY, MODEL_KEY
+from .convert import get_row_converter
+
 try:
     import yaml
 except ModuleNotFoundError:  # pragma: no cover
@@ -23,6 +29,146 @@ def load_entities_from_json(json_filepath) -> dict:
     return entities
 
 
+DEFAULT_BUFFER_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JSONStream:
+    """
+    Reads JSON values one at a time from a text file, holding only the
+    unread part of a buffer.
+    """
+
+    def __init__(self, file, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read(self, size):
+        chunk = self.file.read(size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def peek(self) -> str:
+        """
+        Returns the next character that isn't whitespace, without consuming
+        it, or '' at the end of the file.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._read(self.buffer_size)
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of file"
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}, found {found}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decode the next value, reading more of the file while the value may
+        continue past the end of the buffer.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # a number cut at the end of the buffer decodes as a shorter one
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            # read at least as much again, so a long value is decoded a
+            # bounded number of times
+            self._read(max(self.buffer_size, len(self.buffer) - self.pos))
+
+
+def stream_entities_from_json(json_filepath, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Stream entities from json, a top-level entity or a list of them.
+
+    Yields each top-level entity with its 'data' list as a lazy iterator of
+    rows, each row decoded on its own with ``json.JSONDecoder.raw_decode``,
+    so memory holds one row rather than the whole document. Pass the result
+    to ``Seeder.seed``, which consumes lazy data as it is read. The rows of
+    an entity must be consumed before the next entity is read.
+
+    An entity's 'data' is only streamed if its 'model' key comes first;
+    otherwise it is read as a whole.
+    """
+    with open(json_filepath, 'r', encoding='utf-8') as file:
+        stream = _JSONStream(file, buffer_size)
+        char = stream.peek()
+        if char == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield from _stream_entity(stream)
+                    if stream.expect(',]') == ']':
+                        break
+        else:
+            yield from _stream_entity(stream)
+
+        if stream.peek():
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.pos)
+
+
+def _stream_entity(stream: _JSONStream):
+    if stream.peek() != '{':
+        yield stream.value()
+        return
+
+    stream.expect('{')
+    entity = {}
+    rows = None
+    if stream.peek() != '}':
+        while True:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", stream.buffer, stream.pos)
+            stream.expect(':')
+            if rows is not None:
+                raise errors.InvalidKeyError(f"Invalid key {key!r} after a streamed 'data' list.")
+            if key == DATA_KEY and MODEL_KEY in entity and stream.peek() == '[':
+                rows = entity[DATA_KEY] = _stream_rows(stream)
+                yield entity
+                # the rest of the rows, if the consumer stopped early
+                deque(rows, maxlen=0)
+            else:
+                entity[key] = stream.value()
+            if stream.expect(',}') == '}':
+                break
+    else:
+        stream.expect('}')
+
+    if rows is None:
+        yield entity
+
+
+def _stream_rows(stream: _JSONStream):
+    stream.expect('[')
+    if stream.peek() == ']':
+        stream.expect(']')
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(',]') == ']':
+            return
+
+
 def load_entities_from_yaml(yaml_filepath):
     """
     Get entities from yaml
@@ -59,6 +205,45 @@ def load_entities_from_csv(csv_filepath: str, model) -> dict:
     return entities
 
 
+def stream_entities_from_csv(csv_filepath, model, convert=True) -> dict:
+    """Stream entities from csv file
+
+    Returns the entity with its 'data' as a lazy iterator of rows, which
+    opens the file when it is first read, so memory holds one row rather
+    than the whole file. With ``convert``, the values are converted to the
+    types of the model's columns (see :mod:`sqlalchemyseed.convert`); an
+    invalid value raises ParseError with its line number.
+
+    :param csv_filepath: string csv file path
+    :param model: either str or class
+    :param convert: convert values from text to the column types
+    :return: dict of entities
+    """
+    if isinstance(model, str):
+        model_name = model
+        class_ = util.get_model_class(model) if convert else None
+    else:
+        model_name = '.'.join([model.__module__, model.__name__])
+        class_ = model
+
+    return {'model': model_name, 'data': _stream_csv_rows(csv_filepath, class_ if convert else None)}
+
+
+def _stream_csv_rows(csv_filepath, class_):
+    with open(csv_filepath, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file, skipinitialspace=True)
+        if class_ is None:
+            yield from reader
+            return
+
+        convert_row = get_row_converter(class_, tuple(reader.fieldnames or ()))
+        for row in reader:
+            try:
+                yield convert_row(row)
+            except errors.ParseError as error:
+                raise errors.ParseError(f"{csv_filepath}, line {reader.line_num}: {error}") from error
+
+
 _JSON_EXTENSIONS = {".json"}
 _YAML_EXTENSIONS = {".yaml", ".yml"}
 _CSV_EXTENSIONS = {".csv"}
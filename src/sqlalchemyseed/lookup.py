@@ -0,0 +1,390 @@
+"""
+Lookup module.
+
+Caches the results of ``filter`` lookups for the length of a
+:class:`~sqlalchemyseed.seeder.HybridSeeder` run, so a filter repeated
+across a seed file costs one query instead of one per use.
+
+:func:`batch_lookup` resolves many filters of the same target and key shape
+with one ``SELECT ... WHERE (columns) IN (...)`` per chunk, and a
+:class:`Preloader` answers filters on small lookup tables from in-memory
+indexes without a round trip. Filters by primary key are first looked up in
+the session's identity map, and filters of rows added during the run in
+:class:`RunInstances`.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional, Union
+
+import sqlalchemy
+from sqlalchemy import inspect
+from sqlalchemy.orm.exc import UnmappedColumnError
+from sqlalchemy.orm.util import identity_key
+
+from . import util
+from .attribute import mapper_info
+
+# used when the dialect does not state its bound parameter limit
+DEFAULT_MAX_PARAMETERS = 999
+
+# returned by LookupCache.get on a miss, since a result may be None
+MISSING = object()
+
+
+class LookupStats(NamedTuple):
+    """
+    Hits and misses of a lookup cache.
+    """
+    hits: int
+    misses: int
+
+
+def make_key(target, kwargs: dict) -> Optional[tuple]:
+    """
+    Returns the cache key of a lookup of target, a mapped class or a column,
+    filtered by kwargs. Returns None if a value is unhashable.
+    """
+    try:
+        return target, frozenset(kwargs.items())
+    except TypeError:
+        return None
+
+
+class LookupCache:
+    """
+    Lookup results keyed by :func:`make_key`.
+
+    With a ``maxsize``, the least recently used result is evicted once the
+    cache is full. ``maxsize=0`` disables caching.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize should be None or a non-negative integer")
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> LookupStats:
+        return LookupStats(self._hits, self._misses)
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the cached result of key, counting a hit or a miss.
+        """
+        result = self._results.get(key, MISSING)
+        if result is MISSING:
+            self._misses += 1
+            return default
+        self._hits += 1
+        if self.maxsize is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        if self.maxsize == 0:
+            return
+        self._results[key] = result
+        if self.maxsize is not None:
+            self._results.move_to_end(key)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+        self._hits = 0
+        self._misses = 0
+
+
+def lookup_columns(target, keys: tuple) -> list:
+    """
+    Returns the columns that the keys of a filter of target refer to.
+    """
+    if isinstance(target, sqlalchemy.Column):
+        return [target.table.c[key] for key in keys]
+    return [getattr(target, key) for key in keys]
+
+
+def batch_lookup(session, target, keys: tuple, values: Iterable[tuple]) -> dict:
+    """
+    Look up the target of many filters with the same keys at once.
+
+    Returns the matching results keyed by their values of the keys, in the
+    order of the keys. Values without a match are absent, and values with
+    more than one match have more than one result. The queries are chunked
+    so that each stays below the dialect's bound parameter limit.
+    """
+    columns = lookup_columns(target, keys)
+    if len(columns) == 1:
+        condition = columns[0].in_
+    else:
+        condition = sqlalchemy.tuple_(*columns).in_
+    dialect = session.get_bind().dialect
+    max_parameters = getattr(dialect, "insertmanyvalues_max_parameters", DEFAULT_MAX_PARAMETERS)
+    chunk_size = max(1, max_parameters // len(columns))
+
+    values = list(values)
+    found = {}
+    for index in range(0, len(values), chunk_size):
+        chunk = values[index:index + chunk_size]
+        if len(columns) == 1:
+            chunk = [value for value, in chunk]
+        statement = sqlalchemy.select(target, *columns).where(condition(chunk))
+        for result, *row_values in session.execute(statement):
+            found.setdefault(tuple(row_values), []).append(result)
+    return found
+
+
+def unique_key_sets(class_) -> set:
+    """
+    Returns the attribute names of each unique constraint or unique index of
+    the class's table, other than its primary key, as frozensets.
+    """
+    mapper = inspect(class_)
+    table = mapper.local_table
+    column_sets = [
+        constraint.columns for constraint in table.constraints
+        if isinstance(constraint, sqlalchemy.UniqueConstraint)
+    ]
+    column_sets.extend(index.columns for index in table.indexes if index.unique)
+    key_sets = set()
+    for columns in column_sets:
+        try:
+            key_sets.add(frozenset(mapper.get_property_by_column(column).key for column in columns))
+        except UnmappedColumnError:
+            continue
+    return key_sets
+
+
+class TableIndex:
+    """
+    Instances of a mapped class indexed by the values of some attributes.
+    """
+
+    def __init__(self, class_, keys: tuple):
+        self.class_ = class_
+        self.keys = keys
+        self._instances = {}
+
+    def load(self, session):
+        for instance in session.scalars(sqlalchemy.select(self.class_)):
+            self.add(instance)
+
+    def add(self, instance):
+        value = tuple(getattr(instance, key) for key in self.keys)
+        try:
+            self._instances.setdefault(value, []).append(instance)
+        except TypeError:  # an unhashable value never matches a filter
+            pass
+
+    def get(self, value: tuple) -> list:
+        return self._instances.get(value, [])
+
+
+class Preloader:
+    """
+    Answers filters of preloaded classes from in-memory indexes.
+
+    ``preload`` maps a class, or its path, to the attribute names to index
+    it by. With ``preload="auto"``, a class is indexed the first time a
+    filter uses exactly the attributes of one of its unique constraints. An
+    index loads the whole table when it is first used.
+    """
+
+    def __init__(self, preload: Union[dict, str, None] = None):
+        if isinstance(preload, str) and preload != "auto":
+            raise ValueError("preload should be a dict, 'auto' or None")
+        self.auto = preload == "auto"
+        self._configured = {}
+        if isinstance(preload, dict):
+            for class_, keys in preload.items():
+                if isinstance(class_, str):
+                    class_ = util.get_model_class(class_)
+                self._configured.setdefault(class_, set()).add(frozenset(keys))
+        self._unique_key_sets = {}
+        # (class, frozenset of keys) -> TableIndex, or None if not indexed
+        self._indexes = {}
+
+    def clear(self):
+        self._indexes.clear()
+
+    def index(self, session, class_, keys: frozenset) -> Optional[TableIndex]:
+        """
+        Returns the index of class_ by keys, loading it on first use, or
+        None if class_ isn't preloaded by those keys.
+        """
+        try:
+            return self._indexes[class_, keys]
+        except KeyError:
+            pass
+
+        index = None
+        if keys in self._configured.get(class_, ()) or (self.auto and keys in self._auto_key_sets(class_)):
+            index = TableIndex(class_, tuple(sorted(keys)))
+            index.load(session)
+        self._indexes[class_, keys] = index
+        return index
+
+    def _auto_key_sets(self, class_) -> set:
+        key_sets = self._unique_key_sets.get(class_)
+        if key_sets is None:
+            key_sets = self._unique_key_sets[class_] = unique_key_sets(class_)
+        return key_sets
+
+    def lookup(self, session, class_, target, keys: dict, kwargs: dict):
+        """
+        Returns the result of a filter of target by kwargs, or MISSING if it
+        can't be answered from an index. ``keys`` maps attribute names to the
+        kwargs keys, as returned by :func:`attribute_keys`. Only a single
+        match is an answer; no or many matches are left to a query, which
+        raises accordingly.
+        """
+        index = self.index(session, class_, frozenset(keys))
+        if index is None:
+            return MISSING
+
+        try:
+            instances = index.get(tuple(kwargs[keys[key]] for key in index.keys))
+        except TypeError:  # unhashable value
+            return MISSING
+        if len(instances) != 1:
+            return MISSING
+        return filter_result(session, class_, target, instances[0])
+
+    def add(self, instance):
+        """
+        Add an instance created during the run to the loaded indexes of its
+        class.
+        """
+        if not self._indexes:
+            return
+        for (class_, _), index in self._indexes.items():
+            if index is not None and class_ is type(instance):
+                index.add(instance)
+
+
+def filter_result(session, class_, target, instance):
+    """
+    Returns what a filter of target yields for a matching instance of
+    class_: the instance, or its value of the target column.
+    """
+    if not isinstance(target, sqlalchemy.Column):
+        return instance
+
+    attr_name = inspect(class_).get_property_by_column(target).key
+    value = getattr(instance, attr_name)
+    if value is None and session.autoflush:
+        # a generated key of a row added during this run
+        session.flush()
+        value = getattr(instance, attr_name)
+    return value
+
+
+def attribute_keys(class_, target, kwargs: dict) -> Optional[dict]:
+    """
+    Returns the filter keys of kwargs by the attribute names of class_, or
+    None if a key maps to no attribute of it.
+    """
+    if not isinstance(target, sqlalchemy.Column):
+        return {key: key for key in kwargs} if target is class_ else None
+
+    mapper = inspect(class_)
+    if target.table is not mapper.local_table:
+        return None
+    keys = {}
+    for key in kwargs:
+        try:
+            keys[mapper.get_property_by_column(target.table.c[key]).key] = key
+        except (KeyError, UnmappedColumnError):
+            return None
+    return keys
+
+
+def primary_key_identity(class_, keys: dict, kwargs: dict) -> Optional[tuple]:
+    """
+    Returns the identity of a filter that is exactly the primary key of
+    class_, or None. ``keys`` maps attribute names to the kwargs keys, as
+    returned by :func:`attribute_keys`.
+    """
+    primary_key = mapper_info(class_).primary_key
+    if len(keys) != len(primary_key) or not all(name in keys for name in primary_key):
+        return None
+    return tuple(kwargs[keys[name]] for name in primary_key)
+
+
+def identity_map_lookup(session, class_, identity: tuple):
+    """
+    Returns the instance of the identity if the session's identity map holds
+    it, or MISSING; never queries for an instance that isn't there.
+    """
+    try:
+        key = identity_key(class_, identity)
+    except TypeError:  # unhashable value
+        return MISSING
+    if session.identity_map.get(key) is None:
+        return MISSING
+    # get() handles expired and deleted instances of the identity map
+    instance = session.get(class_, identity)
+    return MISSING if instance is None else instance
+
+
+class RunInstances:
+    """
+    Instances created during a run, indexed by filter keys on demand.
+    """
+
+    def __init__(self):
+        self._instances = {}
+        # (class, frozenset of keys) -> TableIndex
+        self._indexes = {}
+        self._unique_key_sets = {}
+
+    def clear(self):
+        self._instances.clear()
+        self._indexes.clear()
+
+    def add(self, instance):
+        class_ = type(instance)
+        self._instances.setdefault(class_, []).append(instance)
+        for (indexed_class, _), index in self._indexes.items():
+            if indexed_class is class_:
+                index.add(instance)
+
+    def lookup(self, class_, kwargs: dict):
+        """
+        Returns the only instance of class_ created during the run that
+        matches kwargs, or MISSING.
+
+        Only filters that cover the primary key or a unique key of class_
+        are answered, since a row added before the run may match the others
+        too; those are left to a query.
+        """
+        instances = self._instances.get(class_)
+        if not instances:
+            return MISSING
+        keys = frozenset(kwargs)
+        if not any(key_set <= keys for key_set in self._key_sets(class_)):
+            return MISSING
+        index = self._indexes.get((class_, keys))
+        if index is None:
+            index = self._indexes[class_, keys] = TableIndex(class_, tuple(sorted(keys)))
+            for instance in instances:
+                index.add(instance)
+        try:
+            matches = index.get(tuple(kwargs[key] for key in index.keys))
+        except TypeError:  # unhashable value
+            return MISSING
+        return matches[0] if len(matches) == 1 else MISSING
+
+    def _key_sets(self, class_) -> set:
+        key_sets = self._unique_key_sets.get(class_)
+        if key_sets is None:
+            key_sets = unique_key_sets(class_)
+            key_sets.add(frozenset(mapper_info(class_).primary_key))
+            self._unique_key_sets[class_] = key_sets
+        return key_sets
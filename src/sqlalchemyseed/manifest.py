@@ -0,0 +1,84 @@
+"""
+Manifest module.
+
+A manifest table records the content hash of each seeded file and when it
+was seeded, so that later runs can skip files that haven't changed without
+loading them.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import Column, DateTime, MetaData, String, Table
+
+DEFAULT_TABLE_NAME = "sqlalchemyseed_manifest"
+_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path) -> str:
+    """
+    Returns the hex SHA-256 digest of the file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_table(name=DEFAULT_TABLE_NAME, metadata: MetaData = None) -> Table:
+    """
+    Returns the manifest table, on its own metadata unless one is given.
+    """
+    return Table(
+        name,
+        metadata if metadata is not None else MetaData(),
+        Column("path", String(1024), primary_key=True),
+        Column("sha256", String(64), nullable=False),
+        Column("seeded_at", DateTime, nullable=False),
+    )
+
+
+class Manifest:
+    """
+    Seeded files and their content hashes, kept in a manifest table.
+
+    Files are keyed by their path as given, in POSIX form, so a file must be
+    passed by the same path on every run to be recognized. The table is
+    created if it doesn't exist, and records are written through the session
+    so they commit or roll back with the seeded rows.
+    """
+
+    def __init__(self, session, table_name=DEFAULT_TABLE_NAME):
+        self.session = session
+        self.table = manifest_table(table_name)
+        self.table.create(session.connection(), checkfirst=True)
+        self._hashes = dict(session.execute(
+            sqlalchemy.select(self.table.c.path, self.table.c.sha256)
+        ).all())
+
+    @staticmethod
+    def key(path) -> str:
+        return Path(path).as_posix()
+
+    def is_current(self, path, digest: str) -> bool:
+        """
+        Check if the file was seeded with the same content hash.
+        """
+        return self._hashes.get(self.key(path)) == digest
+
+    def record(self, path, digest: str):
+        """
+        Record that the file was seeded with the content hash.
+        """
+        key = self.key(path)
+        values = {"sha256": digest, "seeded_at": datetime.now(timezone.utc).replace(tzinfo=None)}
+        if key in self._hashes:
+            self.session.execute(
+                sqlalchemy.update(self.table).where(self.table.c.path == key).values(values)
+            )
+        else:
+            self.session.execute(sqlalchemy.insert(self.table).values(path=key, **values))
+        self._hashes[key] = digest
@@ -0,0 +1,168 @@
+"""
+Parallel module.
+
+:class:`ParallelSeeder` splits the top-level entities into components that
+write disjoint groups of tables, where tables are grouped by the foreign keys
+between them, and seeds each component on its own session in a thread pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from . import errors, validator
+from .plan import compile_plan
+from .seeder import Seeder
+
+
+class Component(NamedTuple):
+    """
+    Top-level entities whose tables are connected, and those tables.
+    """
+    tables: frozenset
+    entities: list
+
+    @property
+    def table_names(self) -> tuple:
+        return tuple(sorted(table.name for table in self.tables))
+
+
+def entity_tables(entity, ref_prefix="!") -> set:
+    """
+    Returns the tables an entity writes, including association tables.
+    """
+    tables = set()
+    for class_, _ in compile_plan(entity, ref_prefix):
+        mapper = inspect(class_)
+        tables.update(mapper.tables)
+        for relationship in mapper.relationships:
+            if relationship.secondary is not None:
+                tables.add(relationship.secondary)
+    return tables
+
+
+def find_components(entities, ref_prefix="!") -> list:
+    """
+    Group the top-level entities into components, so that no foreign key
+    links the tables of one component to those of another. Components keep
+    the order of their first entity, and entities keep their order.
+    """
+    entities = entities if isinstance(entities, list) else [entities]
+    entity_table_sets = [entity_tables(entity, ref_prefix) if entity else set() for entity in entities]
+
+    # union-find over tables
+    parents = {}
+
+    def find(table):
+        while parents[table] is not table:
+            parents[table] = parents[parents[table]]
+            table = parents[table]
+        return table
+
+    def union(table, other):
+        parents[find(table)] = find(other)
+
+    for tables in entity_table_sets:
+        for table in tables:
+            parents.setdefault(table, table)
+    for tables in entity_table_sets:
+        first = next(iter(tables), None)
+        for table in tables:
+            union(table, first)
+            for foreign_key in table.foreign_keys:
+                if foreign_key.column.table in parents:
+                    union(table, foreign_key.column.table)
+
+    components = {}
+    for entity, tables in zip(entities, entity_table_sets):
+        if not tables:
+            continue
+        root = find(next(iter(tables)))
+        component = components.setdefault(root, ([], set()))
+        component[0].append(entity)
+        component[1].update(tables)
+    return [Component(frozenset(tables), members) for members, tables in components.values()]
+
+
+class ParallelSeeder:
+    """
+    Seeds independent components of the entities concurrently, one
+    :class:`~sqlalchemyseed.seeder.Seeder` and session per component.
+
+    The sessions are committed together once every component has been
+    seeded and flushed; if any component fails, all of them are rolled back
+    and a :class:`~sqlalchemyseed.errors.ComponentSeedError` reports the
+    failures per component. The commits are not atomic across sessions: a
+    commit that fails after others succeeded leaves those committed.
+
+    SQLite allows a single writer, so on SQLite the components are seeded
+    one after another through a single session.
+
+    ``seeder_kwargs`` are passed to each Seeder, e.g. ``mode="bulk"``.
+    """
+
+    def __init__(self, engine, max_workers: int = None, ref_prefix="!", **seeder_kwargs):
+        self.engine = engine
+        self.max_workers = max_workers
+        self.ref_prefix = ref_prefix
+        self.seeder_kwargs = seeder_kwargs
+        self._components = []
+
+    @property
+    def components(self) -> list:
+        """
+        Returns the components of the last seed
+        """
+        return list(self._components)
+
+    @property
+    def is_serial(self) -> bool:
+        return self.engine.dialect.name == "sqlite" or self.max_workers == 1
+
+    def seed(self, entities):
+        validator.validate(entities=entities, ref_prefix=self.ref_prefix)
+        self._components = find_components(entities, self.ref_prefix)
+        if self.is_serial:
+            self._seed_serial()
+        else:
+            self._seed_parallel()
+
+    def _seed_component(self, session, component: Component):
+        seeder = Seeder(session, ref_prefix=self.ref_prefix, **self.seeder_kwargs)
+        seeder.seed(component.entities)
+        session.flush()
+
+    def _seed_serial(self):
+        with Session(self.engine) as session:
+            for component in self._components:
+                try:
+                    self._seed_component(session, component)
+                except Exception as error:  # noqa: BLE001 - reported as a component failure
+                    session.rollback()
+                    raise errors.ComponentSeedError({component.table_names: error}) from error
+            session.commit()
+
+    def _seed_parallel(self):
+        sessions = [Session(self.engine) for _ in self._components]
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._seed_component, session, component)
+                    for session, component in zip(sessions, self._components)
+                ]
+            failures = {
+                component.table_names: future.exception()
+                for component, future in zip(self._components, futures)
+                if future.exception() is not None
+            }
+            if failures:
+                for session in sessions:
+                    session.rollback()
+                raise errors.ComponentSeedError(failures)
+            for session in sessions:
+                session.commit()
+        finally:
+            for session in sessions:
+                session.close()
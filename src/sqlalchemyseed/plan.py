@@ -0,0 +1,143 @@
+"""
+Plan module.
+
+A :class:`RowPlan` holds everything the seeders need to know about a row of
+a given model class and key shape: which keys are constructor kwargs, which
+are references, and the target class and cardinality of each reference.
+Plans are compiled once per (class, key shape, ref_prefix) and cached, so
+seeding a homogeneous list does no per-row introspection.
+"""
+
+import warnings
+from functools import lru_cache
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+from sqlalchemy.orm.attributes import get_attribute, set_attribute
+
+from . import errors, util
+from .attribute import (attr_is_relationship, check_scalar_value, instrumented_attribute,
+                        is_relationship_key, mapper_info, referenced_class)
+from .constants import DATA_KEY, MODEL_KEY
+
+
+class ReferencePlan(NamedTuple):
+    """
+    A reference key of a row and the attribute it sets.
+    """
+    key: str
+    attr_name: str
+    is_relationship: bool
+    uselist: bool
+    target_class: type
+
+    def check_cardinality(self, value, strict=False):
+        """
+        Guard against binding a list to a scalar relationship.
+        """
+        if self.is_relationship and not self.uselist:
+            check_scalar_value(self.attr_name, value, strict)
+
+    def assign(self, instance, value):
+        """
+        Set, or append to a collection, the referenced value of the instance.
+        """
+        if self.uselist:
+            get_attribute(instance, self.attr_name).append(value)
+        else:
+            set_attribute(instance, self.attr_name, value)
+
+
+class RowPlan(NamedTuple):
+    """
+    Compiled plan for rows of a class with a given key shape.
+    """
+    class_: type
+    ref_prefix: str
+    column_keys: tuple
+    # non-prefixed keys naming a relationship, i.e. a forgotten ref_prefix
+    misplaced_keys: tuple
+    references: tuple
+
+    def kwargs(self, row: dict, strict=False) -> dict:
+        """
+        Returns the constructor kwargs of the row.
+
+        A misplaced key is dropped with a warning, or raises when strict.
+        """
+        for key in self.misplaced_keys:
+            message = (
+                f"{key!r} is a relationship attribute; "
+                f"did you mean {self.ref_prefix}{key}?"
+            )
+            if strict:
+                raise errors.InvalidKeyError(message)
+            warnings.warn(message, stacklevel=3)
+        return {key: row[key] for key in self.column_keys}
+
+
+@lru_cache(maxsize=4096)
+def get_plan(class_, key_shape: tuple, ref_prefix: str = "!") -> RowPlan:
+    """
+    Returns the cached plan for rows of class_ whose keys are key_shape.
+    """
+    info = mapper_info(class_)
+    column_keys = []
+    misplaced_keys = []
+    references = []
+    for key in key_shape:
+        if not key.startswith(ref_prefix):
+            if is_relationship_key(class_, key):
+                misplaced_keys.append(key)
+            else:
+                column_keys.append(key)
+            continue
+
+        attr_name = key[len(ref_prefix):]
+        instr_attr = instrumented_attribute(class_, attr_name)
+        is_relationship = attr_is_relationship(instr_attr)
+        references.append(ReferencePlan(
+            key=key,
+            attr_name=attr_name,
+            is_relationship=is_relationship,
+            uselist=attr_name in info.uselist_keys,
+            target_class=referenced_class(instr_attr),
+        ))
+
+    return RowPlan(class_, ref_prefix, tuple(column_keys), tuple(misplaced_keys), tuple(references))
+
+
+def compile_plan(entities, ref_prefix="!") -> dict:
+    """
+    Compile the plans of every (class, key shape) in the entities ahead of
+    seeding. Returns them keyed by (class, key shape).
+    """
+    plans = {}
+    stack = [(entities, None)]
+    while stack:
+        entity, parent_class = stack.pop()
+        if isinstance(entity, list):
+            stack.extend((item, parent_class) for item in entity)
+            continue
+        if not entity:
+            continue
+
+        if MODEL_KEY in entity:
+            class_ = util.get_model_class(entity[MODEL_KEY])
+        else:
+            class_ = parent_class
+
+        source_data = entity[DATA_KEY]
+        for row in source_data if isinstance(source_data, list) else [source_data]:
+            key_shape = tuple(row)
+            plan = plans.get((class_, key_shape))
+            if plan is None:
+                plan = plans[class_, key_shape] = get_plan(class_, key_shape, ref_prefix)
+            for reference in plan.references:
+                stack.append((row[reference.key], reference.target_class))
+    return plans
+
+
+# plans hold the attribute classification, which changes with the mappers
+event.listen(Mapper, "after_configured", get_plan.cache_clear)
@@ -3,18 +3,20 @@ Seeder module
 """
 
 import abc
-import warnings
-from typing import NamedTuple, Union
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
 
 import sqlalchemy
+from sqlalchemy import event
 
-
-from . import errors, util, validator
+from . import bulk, errors, lookup, util, validator
 from .attribute import (attr_is_column, attr_is_relationship, check_scalar_cardinality,
                         foreign_key_column, instrumented_attribute, referenced_class,
                         set_instance_attribute)
 from .constants import DATA_KEY, MODEL_KEY, SOURCE_KEYS
+from .convert import convert_row
 from .json import JsonWalker
+from .plan import ReferencePlan, RowPlan, get_plan
 
 
 class AbstractSeeder(abc.ABC):
@@ -62,6 +64,20 @@ class InstanceAttributeTuple(NamedTuple):
     attr_name: str
 
 
+class _PendingFilter(NamedTuple):
+    """
+    A filter waiting for batched resolution, and where its result goes.
+    """
+    target: object
+    key: tuple
+    kwargs: dict
+    parent: InstanceAttributeTuple
+
+    def assign(self, result):
+        if self.parent is not None:
+            set_instance_attribute(self.parent.instance, self.parent.attr_name, result)
+
+
 def filter_kwargs(kwargs: dict, class_, ref_prefix, strict=False):
     """
     Filters kwargs, dropping keys that name a relationship attribute.
@@ -71,34 +87,74 @@ def filter_kwargs(kwargs: dict, class_, ref_prefix, strict=False):
     constructor. When ``strict`` is True this raises; otherwise it warns and
     drops the key (preserving historical behavior).
     """
-    result = {}
-    for k, v in util.iter_non_ref_kwargs(kwargs, ref_prefix):
-        if attr_is_relationship(instrumented_attribute(class_, str(k))):
-            message = (
-                f"{str(k)!r} is a relationship attribute; "
-                f"did you mean {ref_prefix}{k}?"
-            )
-            if strict:
-                raise errors.InvalidKeyError(message)
-            warnings.warn(message, stacklevel=2)
-            continue
-        result[k] = v
-    return result
+    return get_plan(class_, tuple(kwargs), ref_prefix).kwargs(kwargs, strict)
+
+
+SEED_MODES = ("orm", "bulk")
+
+
+def _is_streaming(entities) -> bool:
+    """
+    Check if the entities, or the data of a top-level entity, is lazy
+    """
+    if validator.is_stream(entities):
+        return True
+    return any(
+        isinstance(entity, dict) and validator.is_stream(entity.get(DATA_KEY))
+        for entity in (entities if isinstance(entities, list) else [entities])
+    )
 
 
 class Seeder:
     """
     Basic Seeder class
+
+    With ``mode="bulk"``, entities are inserted as executemany batches of
+    ``batch_size`` rows without constructing instances; their counts are
+    reported by ``row_counts``. Nested relationships are inserted table by
+    table in dependency order (see :mod:`sqlalchemyseed.bulk`). Entities the
+    bulk path can't express, such as inherited models, go through the ORM.
+
+    In bulk mode, ``on_conflict="ignore"`` skips rows that conflict with
+    existing rows and ``on_conflict="update"`` updates them instead, on the
+    ``conflict_keys`` columns (see :class:`~sqlalchemyseed.bulk.Conflict`).
+
+    With ``convert``, strings of date, datetime, time, Decimal and UUID
+    columns are parsed as the rows are constructed, e.g. ISO 8601 dates
+    from json (see :func:`~sqlalchemyseed.convert.value_converter`).
     """
 
-    def __init__(self, session: sqlalchemy.orm.Session = None, ref_prefix="!", strict=False):
+    def __init__(self, session: sqlalchemy.orm.Session = None, ref_prefix="!", strict=False,
+                 mode="orm", batch_size=bulk.DEFAULT_BATCH_SIZE,
+                 on_conflict: str = None, conflict_keys: Union[list, dict] = None, convert=False):
+        if mode not in SEED_MODES:
+            raise ValueError(f"mode should be one of {', '.join(SEED_MODES)}, got {mode!r}")
+        if on_conflict is not None:
+            if on_conflict not in bulk.ON_CONFLICT_ACTIONS:
+                raise ValueError(
+                    f"on_conflict should be one of {', '.join(bulk.ON_CONFLICT_ACTIONS)}, "
+                    f"got {on_conflict!r}"
+                )
+            if mode != "bulk":
+                raise ValueError("on_conflict requires mode='bulk'")
         self.session = session
         self.ref_prefix = ref_prefix
         self.strict = strict
+        self.mode = mode
+        self.batch_size = batch_size
+        self.conflict = bulk.Conflict(on_conflict, conflict_keys) if on_conflict else None
+        self.convert = convert
 
         self._instances: list = []
+        self._instance_count = 0
+        self._row_counts: dict = {}
+        self._flush_every = None
+        self._expunge = True
+        self._chunk: list = []
         self._walker: JsonWalker = JsonWalker()
         self._current_parent: InstanceAttributeTuple = None
+        self._current_reference: ReferencePlan = None
+        self._schema: validator.SchemaValidator = None
 
     @property
     def instances(self) -> tuple:
@@ -107,6 +163,20 @@ class Seeder:
         """
         return tuple(self._instances)
 
+    @property
+    def instance_count(self) -> int:
+        """
+        Returns the number of seeded top-level instances
+        """
+        return self._instance_count
+
+    @property
+    def row_counts(self) -> dict:
+        """
+        Returns the number of bulk inserted rows, keyed by table name
+        """
+        return dict(self._row_counts)
+
     def _model_class(self):
         """
         Returns class from class path or referenced class
@@ -116,31 +186,222 @@ class Seeder:
             return util.get_model_class(class_path)
 
         # Expects parent is not None
-        instr_attr = getattr(
-            self._current_parent.instance.__class__,
-            self._current_parent.attr_name
-        )
-        return referenced_class(instr_attr)
+        return self._current_reference.target_class
 
-    def seed(self, entities: Union[list, dict], add_to_session=True):
+    def seed(self, entities: Union[list, dict, Iterable], add_to_session=True,
+             flush_every: int = None, expunge=True, single_pass=False, validate=True):
         """
         Seed method
+
+        ``entities``, or the 'data' of a top-level entity, may also be any
+        lazy iterable, e.g. a generator or a csv reader. It is then validated
+        and seeded one item at a time instead of being materialized first.
+
+        When ``flush_every`` is set, the session is flushed after every
+        ``flush_every`` top-level instances and, if ``expunge`` is True, the
+        flushed instances are expunged from it. Only ``instance_count`` is
+        kept; ``instances`` stays empty, so memory does not grow with the
+        size of the entities.
+
+        With ``single_pass``, each entity is validated as it is seeded
+        instead of in a separate walk beforehand. Seeding then runs in a
+        SAVEPOINT (``session.begin_nested()``) that is rolled back if
+        validation fails, so nothing is left half-seeded.
+
+        With ``validate=False``, the separate validation walk is skipped for
+        entities already validated, e.g. in another process.
+        """
+        if flush_every is not None:
+            if flush_every < 1:
+                raise ValueError("flush_every should be a positive integer")
+            if not add_to_session:
+                raise ValueError("flush_every requires add_to_session=True")
+        if self.mode == "bulk" and not add_to_session:
+            raise ValueError("bulk mode writes rows directly and requires add_to_session=True")
+
+        streaming = _is_streaming(entities)
+        if not streaming and not single_pass and validate:
+            validator.validate(entities=entities, ref_prefix=self.ref_prefix)
+        self._reset(flush_every, expunge, single_pass)
+
+        if single_pass and add_to_session:
+            with self.session.begin_nested():
+                self._seed_all(entities, streaming, add_to_session)
+        else:
+            self._seed_all(entities, streaming, add_to_session)
+
+    def bulk_steps(self, entities: Union[list, dict, Iterable], dialect, single_pass=False, validate=True):
         """
-        validator.validate(entities=entities, ref_prefix=self.ref_prefix)
+        Returns the steps that seed the entities in bulk mode, in file
+        order, for the caller to run one after another, e.g. awaited on an
+        ``AsyncConnection``. ``seed`` runs them with
+        :func:`~sqlalchemyseed.bulk.run_steps`.
 
+        Entities are validated as in ``seed``; with ``single_pass``, each
+        one as its steps are generated.
+        """
+        if self.mode != "bulk":
+            raise ValueError("bulk_steps requires mode='bulk'")
+        streaming = _is_streaming(entities)
+        if not streaming and not single_pass and validate:
+            validator.validate(entities=entities, ref_prefix=self.ref_prefix)
+        self._reset(None, True, single_pass)
+        return self._bulk_steps(entities, streaming, dialect)
+
+    def _reset(self, flush_every, expunge, single_pass):
         self._instances.clear()
+        self._chunk.clear()
+        self._instance_count = 0
+        self._row_counts.clear()
+        self._flush_every = flush_every
+        self._expunge = expunge
+        self._schema = None
+        if single_pass:
+            self._schema = validator.get_validator((validator.DATA,), self.ref_prefix)
+
+    def _seed_all(self, entities, streaming, add_to_session):
+        if self.mode == "bulk":
+            dialect = self.session.get_bind().dialect
+            bulk.run_steps(self.session, self._bulk_steps(entities, streaming, dialect))
+        elif streaming:
+            for entity in entities if not isinstance(entities, dict) else [entities]:
+                for part in self._iter_streamed_entity(entity):
+                    self._seed_orm(part)
+        else:
+            self._seed_orm(entities)
+
+        if self._flush_every is not None:
+            self._flush_chunk()
+        elif add_to_session:
+            self.session.add_all(self.instances)
 
+    def _seed_orm(self, entities):
         self._walker.reset(root=entities)
         self._current_parent = None
+        self._current_reference = None
 
         self._pre_seed()
 
-        if add_to_session:
-            self.session.add_all(self.instances)
+    def _iter_streamed_entity(self, entity):
+        """
+        Validate a top-level entity and yield it, or the chunks of its data
+        if lazy
+        """
+        if not isinstance(entity, dict) or not validator.is_stream(entity.get(DATA_KEY)):
+            if self._schema is None:
+                validator.validate(entities=entity, ref_prefix=self.ref_prefix)
+            yield entity
+            return
+
+        schema = validator.get_validator((validator.DATA,), self.ref_prefix)
+        source_key = schema.validate_head(entity)
+
+        def iter_rows():
+            empty = True
+            for row in entity[DATA_KEY]:
+                schema.validate_item(row, source_key)
+                empty = False
+                yield row
+            if empty:
+                raise errors.EmptyDataError("Empty data, 'data' should not be empty.")
+
+        rows = iter_rows()
+        chunk_size = self.batch_size if self.mode == "bulk" else 1
+        while chunk := list(islice(rows, chunk_size)):
+            yield {MODEL_KEY: entity[MODEL_KEY], DATA_KEY: chunk}
+
+    def _bulk_steps(self, entities, streaming, dialect):
+        if not streaming:
+            yield from self._entity_steps(entities, dialect)
+            return
+        for entity in entities if not isinstance(entities, dict) else [entities]:
+            for part in self._iter_streamed_entity(entity):
+                yield from self._entity_steps(part, dialect)
+
+    def _entity_steps(self, entities, dialect):
+        """
+        Yield the steps that bulk insert the entities, in file order,
+        seeding the ones bulk mode can't express through the ORM
+        """
+        validate = self._schema.validate_shallow if self._schema is not None else None
+        graph = self._new_graph(validate)
+        for entity in entities if isinstance(entities, list) else [entities]:
+            if validate is not None:
+                validate(entity)
+            if not entity:
+                continue
+
+            class_ = util.get_model_class(entity[MODEL_KEY])
+            if bulk.supports_bulk(class_) and bulk.is_flat_entity(entity, self.ref_prefix):
+                # rows of earlier nested entities go first, in file order
+                yield from self._graph_steps(graph, dialect)
+                graph = self._new_graph(validate)
+                table_name = sqlalchemy.inspect(class_).local_table.name
+                rows = (
+                    bulk.to_row(class_, self._filter_kwargs(kwargs, class_))
+                    for kwargs in bulk.iter_source_rows(entity)
+                )
+                for statement, group in bulk.insert_batches(class_, dialect, rows, self.batch_size, self.conflict):
+                    yield bulk.Step(statement, group)
+                    self._count_rows(table_name, len(group))
+                continue
+
+            try:
+                graph.add(entity)
+            except bulk.UnsupportedEntity as error:
+                if self.conflict is not None:
+                    raise ValueError(f"on_conflict can't be applied: {error}") from None
+                # flushed before later rows are inserted, in file order
+                yield from self._graph_steps(graph, dialect)
+                graph = self._new_graph(validate)
+                start = len(self._instances)
+                self._seed_orm(entity)
+                yield bulk.Flush(self._instances[start:])
+
+        yield from self._graph_steps(graph, dialect)
+
+    def _new_graph(self, validate):
+        return bulk.BulkGraph(self._filter_kwargs, self.ref_prefix, self.strict, validate, self.conflict)
+
+    def _graph_steps(self, graph, dialect):
+        yield from bulk.graph_steps(graph, dialect, self.batch_size)
+        for table_name, count in graph.row_counts.items():
+            self._count_rows(table_name, count)
+
+    def _filter_kwargs(self, kwargs, class_):
+        filtered_kwargs = filter_kwargs(kwargs, class_, self.ref_prefix, self.strict)
+        if self.convert:
+            convert_row(class_, filtered_kwargs, text=False)
+        return filtered_kwargs
+
+    def _count_rows(self, table_name, count):
+        self._row_counts[table_name] = self._row_counts.get(table_name, 0) + count
+
+    def _add_instance(self, instance):
+        self._instances.append(instance)
+        self._instance_count += 1
+
+    def _chunk_is_full(self):
+        return self._flush_every is not None and len(self._instances) >= self._flush_every
+
+    def _flush_chunk(self):
+        """
+        Flush the pending top-level instances and forget them
+        """
+        self.session.add_all(self._instances)
+        self.session.flush()
+        if self._expunge:
+            for instance in self._chunk:
+                if instance in self.session:
+                    self.session.expunge(instance)
+        self._instances.clear()
+        self._chunk.clear()
 
     def _pre_seed(self):
         # iterates current json as list
         # expected json value is [{'model': ...}, ...] or {'model': ...}
+        if self._schema is not None:
+            self._schema.validate_shallow(self._walker.json, self._current_parent is None)
 
         if self._walker.json_is_list:
             for index in range(len(self._walker.json)):
@@ -148,7 +409,8 @@ class Seeder:
                 self._seed()
                 self._walker.backward()
 
-        elif self._walker.json_is_dict:
+        elif self._walker.json_is_dict and self._walker.json:
+            # an empty parent dict seeds nothing
             self._seed()
 
         self._current_parent = None
@@ -162,20 +424,26 @@ class Seeder:
         self._walker.forward([DATA_KEY])
         # iterate json.current as list
 
-        # @lru_cache()
         def init_item():
             kwargs = self._walker.json
-            filtered_kwargs = filter_kwargs(kwargs, class_, self.ref_prefix, self.strict)
-            instance = class_(**filtered_kwargs)
-
-            if self._current_parent is not None:
-                set_instance_attribute(
-                    self._current_parent.instance, self._current_parent.attr_name, instance
-                )
+            row_plan = get_plan(class_, tuple(kwargs), self.ref_prefix)
+            instance_kwargs = row_plan.kwargs(kwargs, self.strict)
+            if self.convert:
+                convert_row(class_, instance_kwargs, text=False)
+            instance = class_(**instance_kwargs)
+            if self._flush_every is not None and self._expunge:
+                self._chunk.append(instance)
+
+            is_top_level = self._current_parent is None
+            if not is_top_level:
+                self._current_reference.assign(self._current_parent.instance, instance)
             else:
-                self._instances.append(instance)
+                self._add_instance(instance)
+
+            self._seed_children(instance, row_plan)
 
-            self._seed_children(instance)
+            if is_top_level and self._chunk_is_full():
+                self._flush_chunk()
 
         if self._walker.json_is_list:
             for index in range(len(self._walker.json)):
@@ -187,39 +455,61 @@ class Seeder:
 
         self._walker.backward()
 
-    def _seed_children(self, instance):
+    def _seed_children(self, instance, row_plan: RowPlan):
         # expected json is dict:
         # {'model': ...}
-        def seed_child():
-            key = self._walker.current_key
-            if key.startswith(self.ref_prefix):
-                attr_name = key[len(self.ref_prefix):]
-                check_scalar_cardinality(
-                    instance, attr_name, self._walker.json, self.strict)
-                self._current_parent = InstanceAttributeTuple(
-                    instance, attr_name)
-                self._pre_seed()
-
-        self._walker.exec_func_iter(seed_child)
+        parent, reference = self._current_parent, self._current_reference
+        for child_reference in row_plan.references:
+            self._walker.forward([child_reference.key])
+            child_reference.check_cardinality(self._walker.json, self.strict)
+            self._current_parent = InstanceAttributeTuple(instance, child_reference.attr_name)
+            self._current_reference = child_reference
+            self._pre_seed()
+            self._walker.backward()
+        self._current_parent, self._current_reference = parent, reference
 
 
 class HybridSeeder(AbstractSeeder):
     """
     HybridSeeder class. Accepts 'filter' key for referencing children.
+
+    With ``convert``, values of 'data' and 'filter' are converted as with
+    :class:`Seeder`.
     """
 
-    def __init__(self, session: sqlalchemy.orm.Session, ref_prefix: str = '!', strict: bool = False):
+    def __init__(self, session: sqlalchemy.orm.Session, ref_prefix: str = '!', strict: bool = False,
+                 lookup_cache_size: Optional[int] = None, batch_filters: bool = False,
+                 preload: Union[dict, str, None] = None, convert: bool = False):
         self.session = session
         self._instances = []
         self.ref_prefix = ref_prefix
         self.strict = strict
+        self.batch_filters = batch_filters
+        self.convert = convert
         self._walker = JsonWalker()
         self._parent = None
+        self._schema: validator.SchemaValidator = None
+        self._lookups = lookup.LookupCache(lookup_cache_size)
+        self._preloader = lookup.Preloader(preload)
+        self._run_instances = lookup.RunInstances()
+        # deferred filters by lookup key
+        self._pending_filters: Dict[tuple, List[_PendingFilter]] = {}
+        # tables with rows added since the last flush, and whether the session
+        # had changes of its own when the run started
+        self._pending_tables = set()
+        self._untracked_changes = False
 
     @property
     def instances(self):
         return tuple(self._instances)
 
+    @property
+    def lookup_stats(self) -> lookup.LookupStats:
+        """
+        Returns the cache hits and misses of the filter lookups of the last seed
+        """
+        return self._lookups.stats
+
     def get_model_class(self, entity, parent: InstanceAttributeTuple):
         # if self.__model_key in entity and (parent is not None and parent.is_column_attribute()):
         #     raise errors.InvalidKeyError("column attribute does not accept 'model' key")
@@ -231,19 +521,76 @@ class HybridSeeder(AbstractSeeder):
         # parent is not None
         return referenced_class(instrumented_attribute(parent.instance, parent.attr_name))
 
-    def seed(self, entities):
-        validator.hybrid_validate(
-            entities=entities, ref_prefix=self.ref_prefix
-        )
+    def seed(self, entities, single_pass=False, validate=True):
+        """
+        Seed method
+
+        With ``single_pass``, each entity is validated as it is seeded and
+        seeding runs in a SAVEPOINT that is rolled back if validation fails.
+        With ``validate=False``, entities already validated, e.g. in another
+        process, aren't validated again.
+
+        With ``batch_filters``, filters are collected while the entities are
+        walked and resolved afterwards with one query per target and key
+        shape (see :func:`~sqlalchemyseed.lookup.batch_lookup`). Filters
+        with references of their own are still resolved as they are met.
+
+        With ``preload``, filters of preloaded classes are answered from
+        in-memory indexes of their tables (see
+        :class:`~sqlalchemyseed.lookup.Preloader`).
+        """
+        self._schema = None
+        if single_pass:
+            self._schema = validator.get_validator(
+                (validator.DATA, validator.FILTER), self.ref_prefix
+            )
+        elif validate:
+            validator.hybrid_validate(
+                entities=entities, ref_prefix=self.ref_prefix
+            )
 
         self._instances.clear()
         self._walker.reset(root=entities)
         self._parent = None
+        self._lookups.clear()
+        self._preloader.clear()
+        self._run_instances.clear()
+        self._pending_filters.clear()
+        self._pending_tables.clear()
+        self._untracked_changes = bool(self.session.new or self.session.dirty or self.session.deleted)
+
+        event.listen(self.session, "after_flush", self._after_flush)
+        try:
+            if single_pass:
+                with self.session.begin_nested():
+                    self._schema.validate_shallow(entities)
+                    self._pre_seed(entities)
+                    self._resolve_pending_filters()
+            else:
+                self._pre_seed(entities)
+                self._resolve_pending_filters()
+        finally:
+            event.remove(self.session, "after_flush", self._after_flush)
+
+    def _after_flush(self, session, flush_context):
+        self._pending_tables.clear()
+        self._untracked_changes = False
 
-        self._pre_seed(entities)
+    def _flush_for(self, table):
+        """
+        Flush so a query of table sees the rows added to the session, unless
+        none were added since the last flush.
+        """
+        if not self.session.autoflush:
+            return
+        if self._untracked_changes or table in self._pending_tables:
+            self.session.flush()
 
     def _pre_seed(self, entity, parent=None):
         if isinstance(entity, dict):
+            if not entity:
+                # an empty parent dict seeds nothing
+                return
             self._seed(entity, parent)
         else:  # is list
             for item in entity:
@@ -274,19 +621,29 @@ class HybridSeeder(AbstractSeeder):
     def _seed_children(self, instance, kwargs):
         for attr_name, value in util.iter_ref_kwargs(kwargs, self.ref_prefix):
             check_scalar_cardinality(instance, attr_name, value, self.strict)
+            if self._schema is not None:
+                self._schema.validate_shallow(value, entity_is_parent=False)
             self._pre_seed(
                 entity=value, parent=InstanceAttributeTuple(instance, attr_name))
 
     def _setup_instance(self, class_, kwargs: dict, key: str, parent: InstanceAttributeTuple):
         filtered_kwargs = filter_kwargs(kwargs, class_, self.ref_prefix, self.strict)
+        if self.convert:
+            convert_row(class_, filtered_kwargs, text=False)
 
         if key == DATA_KEY:
             instance = self._setup_data_instance(
                 class_, filtered_kwargs, parent)
         else:  # key == key.filter()
-            instance = self._setup_filter_instance(
-                class_, filtered_kwargs, parent
-            )
+            target = self._filter_target(class_, parent)
+            key = lookup.make_key(target, filtered_kwargs)
+            instance = self._find_filter_instance(class_, target, key, filtered_kwargs)
+            if instance is lookup.MISSING:
+                if self._defer_filter(target, key, kwargs, filtered_kwargs, parent):
+                    return None
+                instance = self._lookup(target, filtered_kwargs)
+                if key is not None:
+                    self._lookups.put(key, instance)
 
         # setting parent
         if parent is not None:
@@ -301,6 +658,9 @@ class HybridSeeder(AbstractSeeder):
             )
 
         instance = class_(**filtered_kwargs)
+        self._preloader.add(instance)
+        self._run_instances.add(instance)
+        self._pending_tables.update(sqlalchemy.inspect(class_).tables)
 
         if parent is None:
             self.session.add(instance)
@@ -308,31 +668,119 @@ class HybridSeeder(AbstractSeeder):
 
         return instance
 
-    def _setup_filter_instance(self, class_, filtered_kwargs, parent: InstanceAttributeTuple):
-        if parent is not None:
-            instr_attr = instrumented_attribute(
-                parent.instance, parent.attr_name)
+    @staticmethod
+    def _filter_target(class_, parent: InstanceAttributeTuple):
+        """
+        Returns what a filter looks up: the referenced column of a foreign key
+        attribute, or else a mapped class.
+        """
+        if parent is None:
+            return class_
+
+        instr_attr = instrumented_attribute(parent.instance, parent.attr_name)
+        if attr_is_column(instr_attr):
+            return foreign_key_column(instr_attr)
+        if attr_is_relationship(instr_attr):
+            return referenced_class(instr_attr)
+        return class_
+
+    def _find_filter_instance(self, class_, target, key, filtered_kwargs):
+        """
+        Returns the result of a filter if it is known without a query, else
+        MISSING.
+        """
+        if key is not None:
+            if key in self._pending_filters:
+                # deferred already; counted as a hit once it is resolved
+                return lookup.MISSING
+            result = self._lookups.get(key)
+            if result is not lookup.MISSING:
+                return result
+
+        keys = lookup.attribute_keys(class_, target, filtered_kwargs)
+        if keys is None:
+            return lookup.MISSING
+
+        result = lookup.MISSING
+        identity = lookup.primary_key_identity(class_, keys, filtered_kwargs)
+        if identity is not None:
+            instance = lookup.identity_map_lookup(self.session, class_, identity)
+            if instance is not lookup.MISSING:
+                result = lookup.filter_result(self.session, class_, target, instance)
+        if result is lookup.MISSING:
+            result = self._preloader.lookup(self.session, class_, target, keys, filtered_kwargs)
+        if result is lookup.MISSING and target is class_:
+            # a row added during this run, found without flushing it
+            result = self._run_instances.lookup(class_, filtered_kwargs)
+
+        if result is not lookup.MISSING and key is not None:
+            self._lookups.put(key, result)
+        return result
+
+    def _defer_filter(self, target, key, kwargs, filtered_kwargs,
+                      parent: InstanceAttributeTuple) -> bool:
+        if not self.batch_filters or not filtered_kwargs or key is None:
+            return False
+        # the result of a filter with references is needed right away
+        if any(True for _ in util.iter_ref_kwargs(kwargs, self.ref_prefix)):
+            return False
+        self._pending_filters.setdefault(key, []).append(
+            _PendingFilter(target, key, filtered_kwargs, parent)
+        )
+        return True
+
+    def _resolve_pending_filters(self):
+        pending_filters = self._pending_filters
+        self._pending_filters = {}
+        if not pending_filters:
+            return
+
+        groups = {}
+        for key, (pending, *_) in pending_filters.items():
+            groups.setdefault((pending.target, tuple(pending.kwargs)), []).append(key)
+
+        # see _lookup; batch_lookup of a column skips the autoflush too
+        for target, _ in groups:
+            if isinstance(target, sqlalchemy.Column):
+                self._flush_for(target.table)
+
+        for (target, keys), group in groups.items():
+            values = [tuple(pending_filters[key][0].kwargs[name] for name in keys) for key in group]
+            found = lookup.batch_lookup(self.session, target, keys, values)
+            for key, value in zip(group, values):
+                self._assign_filter_results(pending_filters[key], found.get(value, ()))
+
+    def _assign_filter_results(self, pending_filters: list, results):
+        """
+        Assign the only match of a deferred filter wherever it was used.
+        """
+        first, *rest = pending_filters
+        if len(results) == 1:
+            result = results[0]
         else:
-            instr_attr = None
-
-        if instr_attr is not None and attr_is_column(instr_attr):
-            column = foreign_key_column(instr_attr)
-            # select() of a raw Core column is not ORM-executed and skips the
-            # autoflush that legacy Query performed; flush pending rows so the
-            # filter can see them, honoring the session's autoflush setting.
-            if self.session.autoflush:
-                self.session.flush()
-            return self.session.execute(
-                sqlalchemy.select(column).filter_by(**filtered_kwargs)
-            ).one()[0]
-
-        if instr_attr is not None and attr_is_relationship(instr_attr):
-            return self.session.execute(
-                sqlalchemy.select(referenced_class(instr_attr)).filter_by(**filtered_kwargs)
-            ).scalar_one()
+            # no or many matches raise as a single filter does, and a
+            # value the database compares differently gets its own query
+            result = self._lookup(first.target, first.kwargs)
+        self._lookups.put(first.key, result)
+        first.assign(result)
+        # a repeated filter counts as a hit, as when resolved one at a time
+        for pending in rest:
+            pending.assign(self._lookups.get(first.key, result))
+
+    def _lookup(self, target, filtered_kwargs):
+        if isinstance(target, sqlalchemy.Column):
+            # Flush pending rows of the table so the filter can see them,
+            # honoring the session's autoflush setting, but run the query
+            # itself without autoflush: rows of other tables, such as the row
+            # holding this foreign key, need not be flushed once per filter.
+            self._flush_for(target.table)
+            with self.session.no_autoflush:
+                return self.session.execute(
+                    sqlalchemy.select(target).filter_by(**filtered_kwargs)
+                ).one()[0]
 
         return self.session.execute(
-            sqlalchemy.select(class_).filter_by(**filtered_kwargs)
+            sqlalchemy.select(target).filter_by(**filtered_kwargs)
         ).scalar_one()
 
 
@@ -2,6 +2,9 @@
 Validator module.
 """
 
+from functools import lru_cache
+from typing import Iterable
+
 from . import errors, util
 
 
@@ -41,17 +44,24 @@ class Key:
         return hash(self.name)
 
 
+# shared instances, so validating an entity allocates no Key
+MODEL = Key.model()
+DATA = Key.data()
+FILTER = Key.filter()
+
+
 def check_model_key(entity: dict, entity_is_parent: bool):
-    model = Key.model()
-    if model not in entity and entity_is_parent:
-        raise errors.MissingKeyError("'model' key is missing.")
+    if MODEL.name not in entity:
+        if entity_is_parent:
+            raise errors.MissingKeyError("'model' key is missing.")
+        return
     # check type_
-    if model in entity and not model.is_valid_type(entity[model]):
+    if not MODEL.is_valid_type(entity[MODEL.name]):
         raise errors.InvalidTypeError("'model' data should be 'string'.")
 
 
 def check_keys(entity: dict, source_keys: list):
-    allowed = {Key.model().name, *(key.name for key in source_keys)}
+    allowed = {MODEL.name, *(key.name for key in source_keys)}
     unknown = [key for key in entity if key not in allowed]
     if unknown:
         raise errors.InvalidKeyError(
@@ -90,68 +100,151 @@ def check_data_type(item, source_key: Key):
             f"Invalid type_, '{source_key.name}' should be '{source_key.type_}'")
 
 
+def is_stream(value) -> bool:
+    """
+    Check if value is a lazy iterable, e.g. a generator or a csv reader,
+    rather than a list or dict.
+    """
+    return isinstance(value, Iterable) and not isinstance(value, (dict, list, str, bytes))
+
+
 class SchemaValidator:
+    """
+    Validates the schema of seed entities.
+
+    The entity tree is walked with an explicit stack rather than recursion,
+    so deeply nested files don't hit the recursion limit. Use
+    :func:`get_validator` to share one instance per source keys and prefix.
+    """
 
     def __init__(self, source_keys, ref_prefix):
-        self._source_keys = source_keys
+        self._source_keys = tuple(source_keys)
         self._ref_prefix = ref_prefix
+        self._allowed_keys = frozenset([MODEL.name, *(key.name for key in self._source_keys)])
 
     def validate(self, entities):
         self._pre_validate(entities, entity_is_parent=True)
 
-    def _pre_validate(self, entities: dict, entity_is_parent=True):
-        if not isinstance(entities, dict) and not isinstance(entities, list):
-            raise errors.InvalidTypeError(
-                "Invalid type, should be list or dict")
-        # An empty parent dict (or list) means "seed nothing" and stays valid
-        # for backward compatibility with placeholder seed files. An empty
-        # child dict is a malformed reference (missing 'model'/source key), so
-        # it falls through to _validate.
-        if isinstance(entities, dict):
-            if len(entities) == 0 and entity_is_parent:
+    def validate_shallow(self, entities, entity_is_parent=True):
+        """
+        Validates entities without descending into their references, for
+        seeders that validate each reference as they visit it.
+        """
+        self._pre_validate(entities, entity_is_parent, deep=False)
+
+    def _pre_validate(self, entities: dict, entity_is_parent=True, deep=True):
+        # Work items are (value, entity_is_parent, source_key, start). An item
+        # with a source_key resumes the checks of a source data list at index
+        # start; otherwise value is an entity or a list of entities. Entities
+        # are pushed in reverse and a list is suspended while the references
+        # of one of its items are checked, so errors surface in document order.
+        stack = [(entities, entity_is_parent, None, 0)]
+        while stack:
+            value, is_parent, source_key, start = stack.pop()
+            if source_key is not None:
+                self._validate_items(value, source_key, start, deep, stack)
+                continue
+
+            if isinstance(value, list):
+                stack.extend((entity, is_parent, None, 0) for entity in reversed(value))
+                continue
+            if not isinstance(value, dict):
+                raise errors.InvalidTypeError(
+                    "Invalid type, should be list or dict")
+            # An empty parent dict (or list) means "seed nothing" and stays
+            # valid for backward compatibility with placeholder seed files. An
+            # empty child dict is a malformed reference (missing 'model'/source
+            # key), so it is validated below.
+            if not value and is_parent:
+                continue
+
+            source_key = self.validate_head(value, is_parent)
+            source_data = value[source_key.name]
+            check_source_data(source_data, source_key)
+            if isinstance(source_data, list):
+                stack.append((source_data, False, source_key, 0))
+            else:
+                # source_data is dict
+                self._push_references(self._references(source_data, deep), stack)
+
+    def _validate_items(self, items: list, source_key: Key, start, deep, stack):
+        type_ = source_key.type_
+        for index in range(start, len(items)):
+            item = items[index]
+            if not isinstance(item, type_):
+                check_data_type(item, source_key)
+            references = self._references(item, deep)
+            if references:
+                stack.append((items, False, source_key, index + 1))
+                self._push_references(references, stack)
                 return
-            return self._validate(entities, entity_is_parent)
-        # iterate list
-        for entity in entities:
-            self._pre_validate(entity, entity_is_parent)
 
-    def _validate(self, entity: dict, entity_is_parent=True):
-        check_keys(entity, self._source_keys)
+    def _references(self, source_data: dict, deep) -> list:
+        """
+        Checks the attribute names and returns the reference values.
+        """
+        ref_prefix = self._ref_prefix
+        references = []
+        for attr_name, value in source_data.items():
+            if not isinstance(attr_name, str):
+                self.check_attribute_names(source_data)
+            if deep and attr_name.startswith(ref_prefix):
+                references.append(value)
+        return references
+
+    @staticmethod
+    def _push_references(references: list, stack):
+        stack.extend((value, False, None, 0) for value in reversed(references))
+
+    def validate_head(self, entity: dict, entity_is_parent=True) -> Key:
+        """
+        Validates the keys of an entity, but not its source data.
+        Returns the source key, either data or filter key.
+        """
+        if not self._allowed_keys.issuperset(entity):
+            check_keys(entity, self._source_keys)
         check_model_key(entity, entity_is_parent)
+        present = [key for key in self._source_keys if key.name in entity]
+        if len(present) != 1:
+            return check_source_key(entity, self._source_keys)
+        return present[0]
+
+    def validate_item(self, item, source_key: Key, deep=True):
+        """
+        Validates one item of a source data list, including its references
+        if ``deep``.
+        """
+        check_data_type(item, source_key)
+        # check if item is a relationship attribute
+        self.check_attributes(item, deep)
+
+    def check_attributes(self, source_data: dict, deep=True):
+        self.check_attribute_names(source_data)
+        if not deep:
+            return
+        for _, value in util.iter_ref_kwargs(source_data, self._ref_prefix):
+            self._pre_validate(value, entity_is_parent=False)
 
-        # get source key, either data or filter key
-        source_key = check_source_key(entity, self._source_keys)
-        source_data = entity[source_key]
-
-        check_source_data(source_data, source_key)
-
-        if isinstance(source_data, list):
-            for item in source_data:
-                check_data_type(item, source_key)
-                # check if item is a relationship attribute
-                self.check_attributes(item)
-        else:
-            # source_data is dict
-            # check if item is a relationship attribute
-            self.check_attributes(source_data)
-
-    def check_attributes(self, source_data: dict):
+    @staticmethod
+    def check_attribute_names(source_data: dict):
         for attr_name in source_data:
             if not isinstance(attr_name, str):
                 raise errors.InvalidTypeError(
                     f"Invalid attribute name {attr_name!r}, "
                     "attribute names should be 'string'.")
-        for _, value in util.iter_ref_kwargs(source_data, self._ref_prefix):
-            self._pre_validate(value, entity_is_parent=False)
 
 
-def validate(entities, ref_prefix='!'):
+@lru_cache(maxsize=None)
+def get_validator(source_keys: tuple, ref_prefix='!') -> SchemaValidator:
+    """
+    Returns the shared validator of the source keys and reference prefix.
+    """
+    return SchemaValidator(source_keys, ref_prefix)
 
-    SchemaValidator(source_keys=[Key.data()], ref_prefix=ref_prefix) \
-        .validate(entities=entities)
 
+def validate(entities, ref_prefix='!'):
+    get_validator((DATA,), ref_prefix).validate(entities=entities)
 
-def hybrid_validate(entities, ref_prefix='!'):
 
-    SchemaValidator(source_keys=[Key.data(), Key.filter()], ref_prefix=ref_prefix) \
-        .validate(entities=entities)
+def hybrid_validate(entities, ref_prefix='!'):
+    get_validator((DATA, FILTER), ref_prefix).validate(entities=entities)
@@ -1,10 +1,20 @@
+import asyncio
+import tempfile
 import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-from sqlalchemy import select
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from sqlalchemyseed.aio import AsyncHybridSeeder, AsyncSeeder
-from tests.models import Base, Company, Employee
+from sqlalchemyseed import errors
+from sqlalchemyseed.aio import AsyncHybridSeeder, AsyncSeeder, iter_chunks
+from tests.models import Base, Company, Employee, Person
+from tests.test_bulk_seeder import InheritBase, Manager
+from tests.test_diff import CollatedBase, Price
 
 
 class AsyncSeederTestCase(unittest.IsolatedAsyncioTestCase):
@@ -118,6 +128,333 @@ class AsyncSeederTestCase(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(errors.InvalidTypeError):
             await seeder.seed(entities)
 
+    async def test_bulk_seed_nested_relationship(self):
+        entities = {
+            "model": "tests.models.Company",
+            "data": [
+                {"name": f"C{i}", "!employees": [{"data": {"name": f"E{i}-{j}"}} for j in range(3)]}
+                for i in range(5)
+            ],
+        }
+
+        seeder = AsyncSeeder(self.session, mode="bulk", batch_size=2)
+        await seeder.seed(entities)
+        await self.session.commit()
+
+        employees = (await self.session.execute(select(Employee))).scalars().all()
+        self.assertEqual(len(employees), 15)
+        for employee in employees:
+            company = await self.session.get(Company, employee.company_id)
+            self.assertEqual(employee.name.split("-")[0][1:], company.name[1:])
+        self.assertEqual(seeder.row_counts, {"companies": 5, "employees": 15})
+        self.assertEqual(seeder.instances, ())
+
+    async def test_bulk_seed_writes_flat_rows_in_batches(self):
+        statements = []
+        event.listen(
+            self.engine.sync_engine, "before_execute",
+            lambda conn, clauseelement, *args: statements.append(clauseelement),
+        )
+
+        seeder = AsyncSeeder(self.session, mode="bulk", batch_size=10)
+        await seeder.seed({"model": "tests.models.Person", "data": [{"name": f"P{i}"} for i in range(25)]})
+        await self.session.commit()
+
+        self.assertEqual(len(statements), 3)
+        count = await self.session.scalar(select(func.count()).select_from(Person))
+        self.assertEqual(count, 25)
+
+    async def _count_ticks_while_seeding(self, seeder, entities):
+        ticks = 0
+        done = asyncio.Event()
+
+        async def tick():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def seed():
+            await seeder.seed(entities)
+            done.set()
+
+        # the batches are awaited on the event loop, not in a greenlet
+        with mock.patch.object(self.session, "run_sync", side_effect=AssertionError("run_sync called")):
+            await asyncio.gather(tick(), seed())
+        return ticks
+
+    async def test_bulk_seed_yields_between_batches(self):
+        ticks = await self._count_ticks_while_seeding(
+            AsyncSeeder(self.session, mode="bulk", batch_size=1),
+            {"model": "tests.models.Person", "data": [{"name": f"P{i}"} for i in range(20)]},
+        )
+        self.assertGreaterEqual(ticks, 20)
+
+    async def test_bulk_seed_yields_between_batches_of_nested_entities(self):
+        ticks = await self._count_ticks_while_seeding(
+            AsyncSeeder(self.session, mode="bulk", batch_size=1),
+            {"model": "tests.models.Company", "data": {
+                "name": "Acme", "!employees": [{"data": {"name": f"E{i}"}} for i in range(10)],
+            }},
+        )
+        self.assertGreaterEqual(ticks, 11)
+        count = await self.session.scalar(select(func.count()).select_from(Employee))
+        self.assertEqual(count, 10)
+
+    async def test_bulk_seed_falls_back_to_orm_for_inherited_models(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(InheritBase.metadata.create_all)
+
+        seeder = AsyncSeeder(self.session, mode="bulk")
+        await seeder.seed([
+            {"model": "tests.models.Person", "data": {"name": "Alice"}},
+            {"model": "tests.test_bulk_seeder.Manager", "data": {"name": "Bob", "level": 2}},
+        ])
+
+        self.assertEqual(seeder.row_counts, {"persons": 1})
+        self.assertEqual([manager.name for manager in seeder.instances], ["Bob"])
+        self.assertIsInstance(seeder.instances[0], Manager)
+
+    async def test_bulk_seed_forwards_the_sync_seeder_options(self):
+        entities = [
+            {"model": "tests.models.Company", "data": {"name": "Acme", "!employees": [{"data": {"name": "Alice"}}]}},
+            {"model": "tests.models.Employee", "data": {"name": "Bob", "company_id": 1}},
+        ]
+        await AsyncSeeder(self.session).seed({"model": "tests.models.Company", "data": {"name": "Acme"}})
+        await self.session.commit()
+
+        seeder = AsyncSeeder(self.session, mode="bulk", on_conflict="ignore", conflict_keys={"companies": ["name"]})
+        await seeder.seed(entities, single_pass=True)
+        await self.session.commit()
+
+        rows = (await self.session.execute(select(Employee.name, Employee.company_id).order_by(Employee.id))).all()
+        self.assertEqual(rows, [("Alice", 1), ("Bob", 1)])
+        self.assertEqual(await self.session.scalar(select(func.count()).select_from(Company)), 1)
+
+    async def test_bulk_seed_converts_values(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(CollatedBase.metadata.create_all)
+
+        seeder = AsyncSeeder(self.session, mode="bulk", convert=True)
+        await seeder.seed({"model": "tests.test_diff.Price", "data": {"amount": "1.50", "day": "2024-02-29"}})
+
+        row = (await self.session.execute(select(Price.amount, Price.day))).one()
+        self.assertEqual(row, (Decimal("1.50"), date(2024, 2, 29)))
+
+    async def test_invalid_options_are_rejected_up_front(self):
+        with self.assertRaises(ValueError):
+            AsyncSeeder(self.session, mode="fast")
+        with self.assertRaises(ValueError):
+            AsyncSeeder(self.session, on_conflict="ignore")
+
+    async def test_hybrid_concurrent_on_shared_connection_uses_the_session(self):
+        await AsyncSeeder(self.session).seed({"model": "tests.models.Company", "data": {"name": "Acme"}})
+        await self.session.commit()
+
+        seeder = AsyncHybridSeeder(self.session, max_concurrency=4)
+        await seeder.seed({"model": "tests.models.Employee",
+                           "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}}}})
+
+        self.assertEqual(seeder.instances[0].company.name, "Acme")
+
+    async def test_chunked_seed_runs_each_chunk_in_its_own_run_sync(self):
+        run_sync = self.session.run_sync
+        calls = []
+
+        async def counted(fn, *args, **kwargs):
+            calls.append(fn)
+            return await run_sync(fn, *args, **kwargs)
+
+        entities = [
+            {"model": "tests.models.Company", "data": [
+                {"name": f"C{i}", "!employees": [{"data": {"name": f"E{i}"}}]} for i in range(7)
+            ]},
+            {"model": "tests.models.Person", "data": ({"name": f"P{i}"} for i in range(5))},
+        ]
+        seeder = AsyncSeeder(self.session)
+        with mock.patch.object(self.session, "run_sync", counted):
+            await seeder.seed(entities, chunk_size=3)
+        await self.session.commit()
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(len(seeder.instances), 12)
+        self.assertGreater(seeder.max_stall, 0)
+        self.assertEqual(await self.session.scalar(select(func.count()).select_from(Employee)), 7)
+        self.assertEqual(await self.session.scalar(select(func.count()).select_from(Person)), 5)
+
+    async def test_chunked_seed_yields_between_chunks(self):
+        ticks = 0
+        done = asyncio.Event()
+
+        async def tick():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def seed():
+            await AsyncSeeder(self.session).seed(
+                {"model": "tests.models.Person", "data": [{"name": f"P{i}"} for i in range(10)]},
+                chunk_size=1,
+            )
+            done.set()
+
+        await asyncio.gather(tick(), seed())
+        self.assertGreaterEqual(ticks, 10)
+
+    async def test_chunked_seed_rolls_back_earlier_chunks_on_error(self):
+        entities = [
+            {"model": "tests.models.Person", "data": [{"name": f"P{i}"} for i in range(4)]},
+            {"model": "tests.models.Person", "data": "not rows"},
+        ]
+        with self.assertRaises(errors.InvalidTypeError):
+            await AsyncSeeder(self.session).seed(entities, chunk_size=2)
+
+        self.assertEqual(await self.session.scalar(select(func.count()).select_from(Person)), 0)
+
+    async def test_chunk_size_is_validated(self):
+        with self.assertRaises(ValueError):
+            await AsyncSeeder(self.session).seed({"model": "tests.models.Person", "data": {}}, chunk_size=0)
+        with self.assertRaises(ValueError):
+            await AsyncSeeder(self.session, mode="bulk").seed(
+                {"model": "tests.models.Person", "data": {"name": "Alice"}}, chunk_size=10
+            )
+
+    def test_iter_chunks_splits_data_across_chunks(self):
+        entities = [
+            {"model": "A", "data": [{"i": 0}, {"i": 1}, {"i": 2}]},
+            {"model": "B", "data": {"i": 3}},
+            {"model": "C", "data": iter([{"i": 4}, {"i": 5}])},
+        ]
+
+        chunks = list(iter_chunks(entities, 2))
+
+        self.assertEqual(chunks, [
+            [{"model": "A", "data": [{"i": 0}, {"i": 1}]}],
+            [{"model": "A", "data": [{"i": 2}]}, {"model": "B", "data": {"i": 3}}],
+            [{"model": "C", "data": [{"i": 4}, {"i": 5}]}],
+        ])
+
+    async def test_bulk_seed_requires_add_to_session(self):
+        with self.assertRaises(ValueError):
+            await AsyncSeeder(self.session, mode="bulk").seed(
+                {"model": "tests.models.Person", "data": {"name": "Alice"}}, add_to_session=False
+            )
+
+
+class AsyncHybridConcurrentTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests concurrent filter lookups against a file-backed async SQLite
+    engine, whose pool hands out independent connections."""
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{Path(self.directory.name) / 'seed.db'}")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(self.engine) as session:
+            session.add_all([Company(name=f"C{i}") for i in range(10)])
+            await session.commit()
+        self.session = AsyncSession(self.engine)
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.engine.dispose()
+        self.directory.cleanup()
+
+    async def test_filters_are_queried_concurrently(self):
+        in_flight = 0
+        most_in_flight = 0
+        execute = AsyncSession.execute
+
+        async def counted(session, *args, **kwargs):
+            nonlocal in_flight, most_in_flight
+            in_flight += 1
+            most_in_flight = max(most_in_flight, in_flight)
+            try:
+                return await execute(session, *args, **kwargs)
+            finally:
+                in_flight -= 1
+
+        seeder = AsyncHybridSeeder(self.session, max_concurrency=3)
+        with mock.patch.object(AsyncSession, "execute", counted):
+            await seeder.seed({
+                "model": "tests.models.Employee",
+                "data": [
+                    {"name": f"E{i}", "!company": {"filter": {"name": f"C{i % 10}"}}} for i in range(20)
+                ] + [
+                    {"name": f"F{i}", "!company_id": {"filter": {"name": f"C{i}"}}} for i in range(10)
+                ],
+            })
+
+        self.assertEqual(most_in_flight, 3)
+        for employee in seeder.instances[:20]:
+            self.assertIn(employee.company, self.session)
+        await self.session.commit()
+
+        employees = (await self.session.execute(select(Employee))).scalars().all()
+        self.assertEqual(len(employees), 30)
+        for employee in employees:
+            company = await self.session.get(Company, employee.company_id)
+            self.assertEqual(company.name, f"C{int(employee.name[1:]) % 10}")
+
+    async def test_filters_of_tables_seeded_in_the_run_use_the_session(self):
+        seeder = AsyncHybridSeeder(self.session, max_concurrency=2)
+        await seeder.seed([
+            {"model": "tests.models.Company", "data": {"name": "Acme"}},
+            {"model": "tests.models.Employee",
+             "data": {"name": "Alice", "!company_id": {"filter": {"name": "Acme"}}}},
+        ])
+        await self.session.commit()
+
+        alice = (await self.session.execute(select(Employee))).scalar_one()
+        acme = (await self.session.execute(select(Company).where(Company.name == "Acme"))).scalar_one()
+        self.assertEqual(alice.company_id, acme.id)
+
+    async def test_session_bound_to_a_connection_looks_up_on_it(self):
+        async with self.engine.connect() as connection:
+            await connection.execute(Company.__table__.insert(), {"name": "Uncommitted"})
+            session = AsyncSession(bind=connection)
+            seeder = AsyncHybridSeeder(session, max_concurrency=2)
+            # lookup sessions on new connections wouldn't see the uncommitted row
+            with mock.patch("sqlalchemyseed.aio.AsyncSession", side_effect=AssertionError):
+                await seeder.seed({"model": "tests.models.Employee", "data": [
+                    {"name": "Alice", "!company": {"filter": {"name": "Uncommitted"}}},
+                    {"name": "Bob", "!company": {"filter": {"name": "C1"}}},
+                ]})
+
+            self.assertEqual([employee.company.name for employee in seeder.instances], ["Uncommitted", "C1"])
+            await session.close()
+
+    async def test_session_in_a_transaction_looks_up_on_it(self):
+        companies = {company.name: company for company in (await self.session.execute(select(Company))).scalars()}
+        companies["C1"].name = "Closed"
+        await self.session.flush()
+        companies["C2"].name = "C1"
+        await self.session.flush()
+
+        seeder = AsyncHybridSeeder(self.session, max_concurrency=2)
+        # lookup sessions would still see the committed C1
+        with mock.patch("sqlalchemyseed.aio.AsyncSession", side_effect=AssertionError):
+            await seeder.seed({"model": "tests.models.Employee", "data": [
+                {"name": "Alice", "!company": {"filter": {"name": "C1"}}},
+                {"name": "Bob", "!company_id": {"filter": {"name": "C3"}}},
+            ]})
+
+        alice, bob = seeder.instances
+        self.assertIs(alice.company, companies["C2"])
+        self.assertEqual(bob.company_id, companies["C3"].id)
+
+    async def test_filter_without_match_raises(self):
+        with self.assertRaises(NoResultFound):
+            await AsyncHybridSeeder(self.session, max_concurrency=2).seed({
+                "model": "tests.models.Employee",
+                "data": {"name": "Alice", "!company": {"filter": {"name": "Nobody"}}},
+            })
+
+    async def test_rejects_non_positive_concurrency(self):
+        with self.assertRaises(ValueError):
+            AsyncHybridSeeder(self.session, max_concurrency=0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+"""Tests for the per-mapper attribute cache."""
+
+import pytest
+from sqlalchemy import Column, Integer
+from sqlalchemy.orm import declarative_base
+
+from sqlalchemyseed import attribute
+from sqlalchemyseed.plan import get_plan
+from tests.models import Company, Employee
+
+
+def test_mapper_info_classifies_attributes():
+    info = attribute.mapper_info(Company)
+
+    assert info.column_keys == {"id", "name"}
+    assert info.relationship_keys == {"employees"}
+    assert info.uselist_keys == {"employees"}
+    assert attribute.mapper_info(Employee).uselist_keys == frozenset()
+
+
+def test_mapper_info_is_cached():
+    assert attribute.mapper_info(Company) is attribute.mapper_info(Company)
+
+
+def test_caches_are_cleared_when_mappers_are_configured():
+    info = attribute.mapper_info(Company)
+    plan = get_plan(Company, ("name",), "!")
+
+    NewBase = declarative_base()
+
+    class Gadget(NewBase):  # pylint: disable=unused-variable
+        __tablename__ = "gadgets"
+        id = Column(Integer, primary_key=True)
+
+    NewBase.registry.configure()
+
+    assert attribute.mapper_info(Company) is not info
+    assert get_plan(Company, ("name",), "!") is not plan
+
+
+def test_is_relationship_key_falls_back_for_unmapped_attributes():
+    assert attribute.is_relationship_key(Company, "employees") is True
+    assert attribute.is_relationship_key(Company, "name") is False
+    with pytest.raises(AttributeError):
+        attribute.is_relationship_key(Company, "missing")
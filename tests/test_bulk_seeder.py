@@ -0,0 +1,398 @@
+"""Tests for Seeder's bulk mode."""
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event, func, select
+from sqlalchemy.orm import Session, declarative_base
+
+from sqlalchemyseed import Seeder
+from tests.models import Base, Company, Employee, Person
+from tests.relationships import association_object, many_to_many, many_to_one, one_to_many, one_to_one
+
+InheritBase = declarative_base()
+
+
+class Staff(InheritBase):
+    __tablename__ = "staff"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    kind = Column(String(20))
+    __mapper_args__ = {"polymorphic_on": kind, "polymorphic_identity": "staff"}
+
+
+class Manager(Staff):
+    __tablename__ = "managers"
+    id = Column(Integer, ForeignKey("staff.id"), primary_key=True)
+    level = Column(Integer)
+    __mapper_args__ = {"polymorphic_identity": "manager"}
+
+
+class Badge(InheritBase):
+    __tablename__ = "badges"
+    id = Column(Integer, primary_key=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"))
+
+
+IndexBase = declarative_base()
+
+
+class Tag(IndexBase):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(50), unique=True, index=True)
+    label = Column(String(50))
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def count_executes(session):
+    """Record each statement passed to Connection.execute (one per executemany)."""
+    statements = []
+    event.listen(
+        session.get_bind(), "before_execute",
+        lambda conn, clauseelement, *args: statements.append(str(clauseelement)),
+    )
+    return statements
+
+
+def test_bulk_inserts_flat_rows_without_instances(session):
+    seeder = Seeder(session, mode="bulk", batch_size=2)
+    seeder.seed({
+        "model": "tests.models.Person",
+        "data": [{"name": "Alice"}, {"name": "Bob"}, {"name": "Carol"}],
+    })
+    session.commit()
+
+    assert seeder.instances == ()
+    assert seeder.row_counts == {"persons": 3}
+    assert session.scalars(select(Person.name).order_by(Person.name)).all() == \
+        ["Alice", "Bob", "Carol"]
+
+
+def test_bulk_uses_one_insert_per_batch(session):
+    statements = count_executes(session)
+    seeder = Seeder(session, mode="bulk", batch_size=100)
+    seeder.seed({
+        "model": "tests.models.Person",
+        "data": [{"name": f"P{i}"} for i in range(250)],
+    })
+
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert len(inserts) == 3
+    assert seeder.row_counts == {"persons": 250}
+
+
+def test_bulk_accepts_rows_with_different_keys(session):
+    seeder = Seeder(session, mode="bulk")
+    seeder.seed({
+        "model": "tests.models.Person",
+        "data": [{"name": "Alice"}, {"id": 10, "name": "Bob"}, {}],
+    })
+
+    assert seeder.row_counts == {"persons": 3}
+    assert session.get(Person, 10).name == "Bob"
+
+
+def test_bulk_inserts_nested_rows_by_table(session):
+    statements = count_executes(session)
+    seeder = Seeder(session, mode="bulk")
+    seeder.seed({
+        "model": "tests.models.Company",
+        "data": [
+            {
+                "name": f"Company {i}",
+                "!employees": [{"data": [{"name": f"E{i}-{j}"} for j in range(3)]}],
+            }
+            for i in range(5)
+        ],
+    })
+    session.commit()
+
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert len(inserts) == 2
+    assert seeder.instances == ()
+    assert seeder.row_counts == {"companies": 5, "employees": 15}
+    for company in session.scalars(select(Company)):
+        index = company.name.split()[-1]
+        assert sorted(e.name for e in company.employees) == [f"E{index}-{j}" for j in range(3)]
+
+
+def test_bulk_fills_many_to_one_before_parent(session):
+    seeder = Seeder(session, mode="bulk")
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [
+            {"name": "Alice", "!company": {"data": {"name": "Acme"}}},
+            {"name": "Bob", "!company": {"data": {"name": "Initech"}}},
+        ],
+    })
+    session.commit()
+
+    employees = session.scalars(select(Employee).order_by(Employee.name)).all()
+    assert [(e.name, e.company.name) for e in employees] == \
+        [("Alice", "Acme"), ("Bob", "Initech")]
+
+
+def test_bulk_keeps_file_order_of_nested_and_flat_entities():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seeder = Seeder(session, mode="bulk")
+        seeder.seed([
+            {"model": "tests.models.Company", "data": {"name": "Acme", "!employees": [{"data": {"name": "Alice"}}]}},
+            {"model": "tests.models.Employee", "data": {"name": "Bob", "company_id": 1}},
+        ])
+        session.commit()
+
+        assert seeder.row_counts == {"companies": 1, "employees": 2}
+        assert session.scalars(select(Employee.name).where(Employee.company_id == 1).order_by(Employee.id)).all() == \
+            ["Alice", "Bob"]
+    engine.dispose()
+
+
+def test_bulk_keeps_file_order_of_entities_seeded_through_the_orm():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"))
+    InheritBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        seeder = Seeder(session, mode="bulk")
+        seeder.seed([
+            {"model": "tests.test_bulk_seeder.Manager", "data": {"id": 1, "name": "Bob", "level": 2}},
+            {"model": "tests.test_bulk_seeder.Badge", "data": {"id": 1, "staff_id": 1}},
+        ])
+        session.commit()
+
+        assert seeder.row_counts == {"badges": 1}
+        assert session.get(Badge, 1).staff_id == session.scalars(select(Manager.id)).one()
+    engine.dispose()
+
+
+def test_bulk_falls_back_to_orm_for_inherited_models(session):
+    InheritBase.metadata.create_all(session.get_bind())
+    seeder = Seeder(session, mode="bulk")
+    seeder.seed([
+        {"model": "tests.models.Person", "data": {"name": "Alice"}},
+        {"model": "tests.test_bulk_seeder.Manager", "data": {"name": "Bob", "level": 2}},
+    ])
+    session.commit()
+
+    assert seeder.row_counts == {"persons": 1}
+    assert [manager.name for manager in seeder.instances] == ["Bob"]
+    assert session.scalars(select(Manager)).one().level == 2
+
+
+def test_bulk_rejects_unknown_keys_like_the_orm_path(session):
+    seeder = Seeder(session, mode="bulk")
+    with pytest.raises(AttributeError):
+        seeder.seed({"model": "tests.models.Person", "data": {"nickname": "Al"}})
+
+
+def test_bulk_requires_add_to_session(session):
+    seeder = Seeder(session, mode="bulk")
+    with pytest.raises(ValueError):
+        seeder.seed({"model": "tests.models.Person", "data": {"name": "Al"}},
+                    add_to_session=False)
+
+
+def test_unknown_mode_is_rejected(session):
+    with pytest.raises(ValueError):
+        Seeder(session, mode="fast")
+
+
+@pytest.fixture
+def relationship_session(request):
+    """A session over the tables of one tests.relationships module."""
+    engine = create_engine("sqlite://")
+    request.param.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.parametrize("relationship_session", [one_to_many], indirect=True)
+def test_bulk_one_to_many(relationship_session):
+    Seeder(relationship_session, mode="bulk").seed({
+        "model": "tests.relationships.one_to_many.Parent",
+        "data": {"value": "parent_1", "!children": [
+            {"data": {"value": "child_1"}},
+            {"model": "tests.relationships.one_to_many.Child", "data": {"value": "child_2"}},
+        ]},
+    })
+
+    parent = relationship_session.scalars(select(one_to_many.Parent)).one()
+    assert sorted(child.value for child in parent.children) == ["child_1", "child_2"]
+
+
+@pytest.mark.parametrize("relationship_session", [many_to_one], indirect=True)
+def test_bulk_many_to_one(relationship_session):
+    Seeder(relationship_session, mode="bulk").seed([
+        {"model": "tests.relationships.many_to_one.Parent",
+         "data": {"value": f"parent_{i}", "!child": {"data": {"value": f"child_{i}"}}}}
+        for i in range(2)
+    ])
+
+    parents = relationship_session.scalars(
+        select(many_to_one.Parent).order_by(many_to_one.Parent.value)).all()
+    assert [parent.child.value for parent in parents] == ["child_0", "child_1"]
+
+
+@pytest.mark.parametrize("relationship_session", [one_to_one], indirect=True)
+def test_bulk_one_to_one(relationship_session):
+    Seeder(relationship_session, mode="bulk").seed({
+        "model": "tests.relationships.one_to_one.Parent",
+        "data": {"value": "parent_1", "!child": {"data": {"value": "child_1"}}},
+    })
+
+    parent = relationship_session.scalars(select(one_to_one.Parent)).one()
+    assert parent.child.value == "child_1"
+
+
+@pytest.mark.parametrize("relationship_session", [many_to_many], indirect=True)
+def test_bulk_many_to_many(relationship_session):
+    seeder = Seeder(relationship_session, mode="bulk")
+    seeder.seed([
+        {"model": "tests.relationships.many_to_many.Parent",
+         "data": {"value": "parent_1", "!children": [
+             {"data": [{"value": "child_1"}, {"value": "child_2"}]}]}},
+        {"model": "tests.relationships.many_to_many.Child",
+         "data": {"value": "child_3", "!parents": [
+             {"data": [{"value": "parent_2"}, {"value": "parent_3"}]}]}},
+    ])
+
+    assert seeder.row_counts == {"left": 3, "right": 3, "association": 4}
+    parents = relationship_session.scalars(
+        select(many_to_many.Parent).order_by(many_to_many.Parent.value)).all()
+    assert [sorted(child.value for child in parent.children) for parent in parents] == \
+        [["child_1", "child_2"], ["child_3"], ["child_3"]]
+
+
+@pytest.mark.parametrize("relationship_session", [association_object], indirect=True)
+def test_bulk_association_object(relationship_session):
+    Seeder(relationship_session, mode="bulk").seed({
+        "model": "tests.relationships.association_object.Parent",
+        "data": {"value": "parent_1", "!children": [{"data": {
+            "extra_value": "association_1",
+            "!child": {"data": {"value": "child_1"}},
+        }}]},
+    })
+
+    parent = relationship_session.scalars(select(association_object.Parent)).one()
+    association = parent.children[0]
+    assert association.extra_value == "association_1"
+    assert association.child.value == "child_1"
+
+
+def test_on_conflict_requires_bulk_mode(session):
+    with pytest.raises(ValueError):
+        Seeder(session, on_conflict="ignore")
+    with pytest.raises(ValueError):
+        Seeder(session, mode="bulk", on_conflict="replace")
+
+
+def test_on_conflict_ignore_skips_existing_rows(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+    statements = count_executes(session)
+
+    seeder = Seeder(session, mode="bulk", on_conflict="ignore")
+    seeder.seed({"model": "tests.models.Company",
+                 "data": [{"name": "Acme"}, {"name": "Initech"}, {"name": "Umbrella"}]})
+    session.commit()
+
+    assert len([s for s in statements if s.startswith("INSERT")]) == 1
+    assert "ON CONFLICT (name) DO NOTHING" in statements[0]
+    assert session.scalars(select(Company.name).order_by(Company.name)).all() == \
+        ["Acme", "Initech", "Umbrella"]
+
+
+def test_on_conflict_update_updates_existing_rows(session):
+    session.add(Person(id=1, name="Alice"))
+    session.commit()
+
+    seeder = Seeder(session, mode="bulk", on_conflict="update", conflict_keys=["id"])
+    seeder.seed({"model": "tests.models.Person",
+                 "data": [{"id": 1, "name": "Alicia"}, {"id": 2, "name": "Bob"}]})
+    session.commit()
+
+    assert session.execute(select(Person.id, Person.name).order_by(Person.id)).all() == \
+        [(1, "Alicia"), (2, "Bob")]
+
+
+def test_on_conflict_reseeding_is_idempotent(session):
+    entities = {"model": "tests.models.Company", "data": [
+        {"name": "Acme", "!employees": [{"data": {"id": 1, "name": "Alice"}}]},
+        {"name": "Initech", "!employees": [{"data": {"id": 2, "name": "Bob"}}]},
+    ]}
+
+    for _ in range(2):
+        Seeder(session, mode="bulk", on_conflict="ignore").seed(entities)
+    session.commit()
+
+    employees = session.scalars(select(Employee).order_by(Employee.id)).all()
+    assert [(e.name, e.company.name) for e in employees] == [("Alice", "Acme"), ("Bob", "Initech")]
+
+
+def test_on_conflict_targets_unique_indexes():
+    engine = create_engine("sqlite://")
+    IndexBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        for label in ("old", "new"):
+            Seeder(session, mode="bulk", on_conflict="update").seed({
+                "model": "tests.test_bulk_seeder.Tag", "data": {"slug": "python", "label": label},
+            })
+        session.commit()
+
+        assert session.execute(select(Tag.slug, Tag.label)).all() == [("python", "new")]
+    engine.dispose()
+
+
+def test_on_conflict_reads_back_keys_of_existing_parents(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+
+    Seeder(session, mode="bulk", on_conflict="ignore").seed({
+        "model": "tests.models.Employee",
+        "data": {"name": "Alice", "!company": {"data": {"name": "Acme"}}},
+    })
+    session.commit()
+
+    assert session.scalars(select(Employee)).one().company.name == "Acme"
+    assert session.scalar(select(func.count()).select_from(Company)) == 1
+
+
+def test_on_conflict_conflict_keys_by_table(session):
+    session.add(Person(id=1, name="Alice"))
+    session.commit()
+
+    Seeder(session, mode="bulk", on_conflict="update", conflict_keys={"persons": ["id"]}).seed(
+        {"model": "tests.models.Person", "data": {"id": 1, "name": "Alicia"}})
+
+    assert session.get(Person, 1).name == "Alicia"
+
+
+@pytest.mark.parametrize("relationship_session", [many_to_many], indirect=True)
+def test_on_conflict_ignores_existing_association_rows(relationship_session):
+    entities = {"model": "tests.relationships.many_to_many.Parent",
+                "data": {"id": 1, "value": "parent_1", "!children": [
+                    {"data": [{"id": 1, "value": "child_1"}]}]}}
+
+    for _ in range(2):
+        seeder = Seeder(relationship_session, mode="bulk", on_conflict="ignore")
+        seeder.seed(entities)
+
+    parent = relationship_session.scalars(select(many_to_many.Parent)).one()
+    assert [child.value for child in parent.children] == ["child_1"]
+
+
+def test_on_conflict_rejects_entities_that_need_the_orm(session):
+    InheritBase.metadata.create_all(session.get_bind())
+    with pytest.raises(ValueError):
+        Seeder(session, mode="bulk", on_conflict="ignore").seed(
+            {"model": "tests.test_bulk_seeder.Manager", "data": {"name": "Bob"}})
@@ -1,12 +1,14 @@
 """Tests for the sqlalchemyseed command-line interface."""
 
 import json
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
 
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
-from sqlalchemyseed import cli
+from sqlalchemyseed import cli, validator
 from tests.models import Base, Person
 
 
@@ -147,3 +149,108 @@ def test_debug_flag_reraises_with_traceback(tmp_path, db_url):
 
     with pytest.raises(ValueError):
         cli.main([str(bad_file), "--url", db_url, "--debug"])
+
+
+def test_manifest_skips_unchanged_files(tmp_path, db_url, capsys):
+    first = write_json(tmp_path / "first.json", person_entities("Alice"))
+    second = write_json(tmp_path / "second.json", person_entities("Bob"))
+    args = [str(first), str(second), "--url", db_url, "--manifest"]
+
+    assert cli.main(args) == 0
+    assert count_persons(db_url) == 2
+
+    write_json(second, person_entities("Bob", "Carol"))
+    capsys.readouterr()
+    assert cli.main(args) == 0
+    assert f"Skipped unchanged file: {first}" in capsys.readouterr().out
+    assert count_persons(db_url) == 4  # second.json seeded again
+
+
+def test_manifest_summary_counts_seeded_files_only(tmp_path, db_url, capsys):
+    first = write_json(tmp_path / "first.json", person_entities("Alice"))
+    second = write_json(tmp_path / "second.json", person_entities("Bob"))
+    args = [str(first), str(second), "--url", db_url, "--manifest"]
+    assert cli.main(args) == 0
+
+    write_json(second, person_entities("Bob", "Carol"))
+    capsys.readouterr()
+    assert cli.main(args) == 0
+    assert "Seeded 2 entities from 1 file(s)." in capsys.readouterr().out
+
+
+def test_manifest_is_rolled_back_on_dry_run(tmp_path, db_url):
+    data_file = write_json(tmp_path / "people.json", person_entities("Alice"))
+
+    assert cli.main([str(data_file), "--url", db_url, "--manifest", "--dry-run"]) == 0
+    assert cli.main([str(data_file), "--url", db_url, "--manifest"]) == 0
+    assert count_persons(db_url) == 1
+
+
+def test_manifest_is_not_recorded_for_failed_runs(tmp_path, db_url):
+    good = write_json(tmp_path / "good.json", person_entities("Alice"))
+    bad = write_json(tmp_path / "bad.json", {"model": "tests.models.Person", "data": []})
+
+    assert cli.main([str(good), str(bad), "--url", db_url, "--manifest"]) == 1
+    assert cli.main([str(good), "--url", db_url, "--manifest"]) == 0
+    assert count_persons(db_url) == 1
+
+
+def test_jobs_seed_files_in_order(tmp_path, db_url):
+    seeds = tmp_path / "seeds"
+    seeds.mkdir()
+    for index in range(4):
+        write_json(seeds / f"{index:02}.json", person_entities(f"P{index}a", f"P{index}b"))
+
+    assert cli.main([str(seeds), "--url", db_url, "--jobs", "2"]) == 0
+    with Session(create_engine(db_url)) as session:
+        names = [person.name for person in session.query(Person).order_by(Person.id)]
+    assert names == [f"P{index}{suffix}" for index in range(4) for suffix in "ab"]
+
+
+@pytest.mark.parametrize("content, error", [
+    ('{"model": "tests.models.Person"}', "MissingKeyError"),
+    ("{not json", "JSONDecodeError"),
+])
+def test_jobs_report_invalid_files_and_seed_nothing(tmp_path, db_url, capsys, content, error):
+    good = write_json(tmp_path / "good.json", person_entities("Alice"))
+    bad = tmp_path / "bad.json"
+    bad.write_text(content, encoding="utf-8")
+
+    assert cli.main([str(good), str(bad), "--url", db_url, "--jobs", "2"]) == 1
+    assert error in capsys.readouterr().err
+    assert count_persons(db_url) == 0
+
+
+@pytest.mark.parametrize("jobs, validated_here", [("1", 2), ("2", 0)])
+def test_files_are_validated_once(tmp_path, db_url, jobs, validated_here):
+    files = [str(write_json(tmp_path / f"{name}.json", person_entities(name))) for name in ("Alice", "Bob")]
+
+    with mock.patch("sqlalchemyseed.validator.validate", wraps=validator.validate) as validate:
+        assert cli.main([*files, "--url", db_url, "--jobs", jobs]) == 0
+
+    # with --jobs 2 the files are validated in the worker processes only
+    assert validate.call_count == validated_here
+    assert count_persons(db_url) == 2
+
+
+def test_jobs_load_a_bounded_number_of_files_ahead(tmp_path, monkeypatch):
+    submitted = []
+
+    class RecordingExecutor(ProcessPoolExecutor):
+        def submit(self, fn, path, *args):
+            submitted.append(path)
+            return super().submit(fn, path, *args)
+
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", RecordingExecutor)
+    files = [write_json(tmp_path / f"{index:02}.json", person_entities(f"P{index}")) for index in range(8)]
+
+    loading = cli._load_files(files, None, False, "!", 2)
+    assert next(loading)["data"] == [{"name": "P0"}]
+    assert submitted == files[:4]
+    assert [entities["data"][0]["name"] for entities in loading] == [f"P{index}" for index in range(1, 8)]
+
+
+def test_jobs_must_be_positive(tmp_path, db_url):
+    data_file = write_json(tmp_path / "people.json", person_entities("Alice"))
+    with pytest.raises(SystemExit):
+        cli.main([str(data_file), "--url", db_url, "--jobs", "0"])
@@ -0,0 +1,175 @@
+"""Tests for converting values to column types, and streamed csv files."""
+
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from sqlalchemy import (Boolean, Column, Date, DateTime, Float, Integer, Numeric, String, Time, Uuid,
+                        create_engine, select)
+from sqlalchemy.orm import Session, declarative_base
+
+from sqlalchemyseed import HybridSeeder, Seeder, errors, stream_entities_from_csv
+from sqlalchemyseed.convert import convert_row, get_row_converter, parse_bool
+
+TypedBase = declarative_base()
+
+
+class Reading(TypedBase):
+    __tablename__ = "readings"
+
+    id = Column(Integer, primary_key=True)
+    label = Column(String(50))
+    count = Column(Integer, nullable=False)
+    active = Column(Boolean)
+    price = Column(Numeric(10, 2))
+    ratio = Column(Float)
+    day = Column(Date)
+    taken_at = Column(DateTime)
+    at = Column(Time)
+    ref = Column(Uuid)
+
+
+REF = "12345678-1234-5678-1234-567812345678"
+CSV_TEXT = (
+    "label,count,active,price,ratio,day,taken_at,at\n"
+    "first,1,true,9.99,0.5,2024-02-29,2024-02-29T10:30:00,10:30\n"
+    ",2,,,,,,\n"
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    TypedBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "readings.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("true", True), ("Yes", True), ("1", True), (" on", True),
+    ("false", False), ("N", False), ("0", False), ("off", False),
+])
+def test_parse_bool(value, expected):
+    assert parse_bool(value) is expected
+
+
+def test_parse_bool_rejects_other_text():
+    with pytest.raises(ValueError):
+        parse_bool("maybe")
+
+
+def test_convert_row_uses_column_types():
+    row = convert_row(Reading, {
+        "label": "x", "count": "3", "active": "false", "price": "1.10", "ratio": "0.25",
+        "day": "2024-01-02", "taken_at": "2024-01-02T03:04:05Z", "at": "07:08:09", "ref": REF,
+    })
+
+    assert row == {
+        "label": "x", "count": 3, "active": False, "price": Decimal("1.10"), "ratio": 0.25,
+        "day": date(2024, 1, 2), "taken_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "at": time(7, 8, 9), "ref": UUID(REF),
+    }
+
+
+def test_convert_row_empty_nullable_values_are_none():
+    row = convert_row(Reading, {"label": "", "active": "", "price": "", "day": ""})
+    assert row == {"label": "", "active": None, "price": None, "day": None}
+
+
+def test_convert_row_keeps_references_and_unknown_keys():
+    row = {"count": "1", "!other": {"data": {}}, "nickname": "x"}
+    assert convert_row(Reading, row) == {"count": 1, "!other": {"data": {}}, "nickname": "x"}
+
+
+@pytest.mark.parametrize("row", [{"count": ""}, {"count": "one"}, {"price": "cheap"}])
+def test_convert_row_rejects_invalid_values(row):
+    with pytest.raises(errors.ParseError):
+        convert_row(Reading, row)
+
+
+def test_row_converter_is_cached_per_key_shape():
+    assert get_row_converter(Reading, ("count",)) is get_row_converter(Reading, ("count",))
+    assert get_row_converter(Reading, ("count",)) is not get_row_converter(Reading, ("count", "day"))
+
+
+def test_convert_decoded_values_parses_strings_of_types_json_lacks():
+    taken_at = datetime(2024, 1, 2, 3, 4)
+    row = convert_row(Reading, {
+        "label": "2024-01-02", "count": 3, "active": True, "price": 1.1, "ratio": 0.5,
+        "day": "2024-01-02", "taken_at": taken_at, "at": "", "ref": REF,
+    }, text=False)
+
+    assert row == {
+        "label": "2024-01-02", "count": 3, "active": True, "price": Decimal("1.1"), "ratio": 0.5,
+        "day": date(2024, 1, 2), "taken_at": taken_at, "at": None, "ref": UUID(REF),
+    }
+
+
+def test_convert_decoded_values_rejects_invalid_strings():
+    with pytest.raises(errors.ParseError):
+        convert_row(Reading, {"day": "yesterday"}, text=False)
+
+
+JSON_ENTITY = {"model": "tests.test_convert.Reading", "data": [
+    {"count": 1, "price": "9.99", "day": "2024-02-29", "taken_at": "2024-02-29T10:30:00", "ref": REF},
+    {"count": 2, "price": 0.1, "at": "10:30"},
+]}
+
+
+@pytest.mark.parametrize("seeder_class, kwargs", [
+    (Seeder, {}), (Seeder, {"mode": "bulk"}), (HybridSeeder, {}),
+])
+def test_seeders_convert_decoded_values(session, seeder_class, kwargs):
+    seeder_class(session, convert=True, **kwargs).seed(JSON_ENTITY)
+    session.commit()
+
+    first, second = session.scalars(select(Reading).order_by(Reading.id))
+    assert (first.price, first.day, first.taken_at, first.ref) == (
+        Decimal("9.99"), date(2024, 2, 29), datetime(2024, 2, 29, 10, 30), UUID(REF)
+    )
+    assert (second.price, second.at) == (Decimal("0.10"), time(10, 30))
+    assert JSON_ENTITY["data"][0]["day"] == "2024-02-29"  # the input is left as it was
+
+
+def test_stream_csv_converts_rows_lazily(csv_file):
+    entity = stream_entities_from_csv(csv_file, Reading)
+
+    assert entity["model"] == "tests.test_convert.Reading"
+    assert not isinstance(entity["data"], list)
+    first, second = entity["data"]
+    assert first["count"] == 1 and first["price"] == Decimal("9.99") and first["at"] == time(10, 30)
+    assert second == {"label": "", "count": 2, "active": None, "price": None, "ratio": None,
+                      "day": None, "taken_at": None, "at": None}
+
+
+def test_stream_csv_without_convert_keeps_text(csv_file):
+    entity = stream_entities_from_csv(csv_file, "tests.test_convert.Reading", convert=False)
+    assert next(iter(entity["data"]))["count"] == "1"
+
+
+def test_stream_csv_reports_line_of_invalid_value(tmp_path):
+    path = tmp_path / "readings.csv"
+    path.write_text("count\n1\nlots\n", encoding="utf-8")
+
+    with pytest.raises(errors.ParseError, match="line 3"):
+        list(stream_entities_from_csv(path, Reading)["data"])
+
+
+def test_seed_streamed_csv(session, csv_file):
+    seeder = Seeder(session, mode="bulk", batch_size=1)
+    seeder.seed(stream_entities_from_csv(csv_file, Reading))
+    session.commit()
+
+    readings = session.scalars(select(Reading).order_by(Reading.id)).all()
+    assert seeder.row_counts == {"readings": 2}
+    assert [reading.taken_at for reading in readings] == [datetime(2024, 2, 29, 10, 30), None]
+    assert [reading.active for reading in readings] == [True, None]
@@ -0,0 +1,180 @@
+"""Tests for DiffSeeder."""
+
+import pytest
+from sqlalchemy import Column, Date, Integer, Numeric, String, TypeDecorator, create_engine, event, select
+from sqlalchemy.orm import Session, declarative_base
+
+from sqlalchemyseed.diff import DiffCounts, DiffSeeder
+from tests.models import Base, Company, Person
+
+CollatedBase = declarative_base()
+
+
+class Negated(TypeDecorator):
+    """Stores the negated integer, so the database orders it in reverse."""
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else -value
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else -value
+
+
+class Word(CollatedBase):
+    __tablename__ = "words"
+    id = Column(Integer, primary_key=True)
+    text = Column(String(20, collation="NOCASE"), unique=True)
+    rank = Column(Negated, unique=True)
+
+
+class Price(CollatedBase):
+    __tablename__ = "prices"
+    id = Column(Integer, primary_key=True)
+    amount = Column(Numeric(10, 2))
+    day = Column(Date)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def count_writes(session):
+    statements = []
+    event.listen(
+        session.get_bind(), "before_execute",
+        lambda conn, clauseelement, *args: statements.append(str(clauseelement).split()[0]),
+    )
+    return statements
+
+
+def persons(session):
+    return session.execute(select(Person.id, Person.name).order_by(Person.id)).all()
+
+
+def test_diff_inserts_updates_and_keeps_rows(session):
+    session.add_all([Person(id=1, name="Alice"), Person(id=2, name="Bob"), Person(id=4, name="Dan")])
+    session.commit()
+
+    counts = DiffSeeder(session).seed({
+        "model": "tests.models.Person",
+        "data": [{"id": 3, "name": "Carol"}, {"id": 2, "name": "Robert"}, {"id": 1, "name": "Alice"}],
+    })
+
+    assert counts == {"persons": DiffCounts(inserted=1, updated=1, deleted=0, unchanged=1)}
+    assert persons(session) == [(1, "Alice"), (2, "Robert"), (3, "Carol"), (4, "Dan")]
+
+
+def test_diff_deletes_unmatched_rows(session):
+    session.add_all([Person(id=i, name=f"P{i}") for i in range(1, 6)])
+    session.commit()
+
+    seeder = DiffSeeder(session, delete=True)
+    seeder.seed({"model": "tests.models.Person", "data": [{"id": 2, "name": "P2"}, {"id": 4, "name": "P4"}]})
+
+    assert seeder.counts == {"persons": DiffCounts(deleted=3, unchanged=2)}
+    assert persons(session) == [(2, "P2"), (4, "P4")]
+
+
+def test_diff_by_natural_key(session):
+    session.add_all([Company(id=10, name="Acme"), Company(id=11, name="Initech")])
+    session.commit()
+
+    counts = DiffSeeder(session, key=["name"], delete=True).seed(
+        {"model": "tests.models.Company", "data": [{"name": "Acme"}, {"name": "Umbrella"}]})
+
+    assert counts["companies"] == DiffCounts(inserted=1, deleted=1, unchanged=1)
+    assert session.scalars(select(Company.name).order_by(Company.name)).all() == ["Acme", "Umbrella"]
+    assert session.scalar(select(Company.id).where(Company.name == "Acme")) == 10
+
+
+def test_diff_writes_only_changes_in_batches(session):
+    session.add_all([Person(id=i, name=f"P{i}") for i in range(100)])
+    session.commit()
+    statements = count_writes(session)
+
+    DiffSeeder(session, batch_size=10).seed({
+        "model": "tests.models.Person",
+        "data": [{"id": i, "name": f"P{i}" if i % 10 else "changed"} for i in range(100)],
+    })
+
+    assert statements.count("UPDATE") == 1
+    assert "INSERT" not in statements and "DELETE" not in statements
+
+
+def test_diff_unchanged_reseed_writes_nothing(session):
+    entities = {"model": "tests.models.Person", "data": [{"id": i, "name": f"P{i}"} for i in range(5)]}
+    DiffSeeder(session).seed(entities)
+    statements = count_writes(session)
+
+    counts = DiffSeeder(session).seed(entities)
+
+    assert counts == {"persons": DiffCounts(unchanged=5)}
+    assert statements == ["SELECT"]
+
+
+@pytest.mark.parametrize("data", [
+    [{"name": "no key"}],
+    [{"id": 1, "name": "a"}, {"id": 1, "name": "b"}],
+])
+def test_diff_rejects_rows_without_unique_keys(session, data):
+    with pytest.raises(ValueError):
+        DiffSeeder(session).seed({"model": "tests.models.Person", "data": data})
+
+
+def test_diff_rejects_references(session):
+    with pytest.raises(ValueError):
+        DiffSeeder(session, key=["name"]).seed({"model": "tests.models.Company", "data": {
+            "name": "Acme", "!employees": [{"data": {"name": "Alice"}}]}})
+
+
+@pytest.fixture
+def typed_session():
+    engine = create_engine("sqlite://")
+    CollatedBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_diff_orders_string_keys_by_code_point_whatever_the_collation(typed_session):
+    typed_session.add_all([Word(text="apple"), Word(text="Banana"), Word(text="cherry")])
+    typed_session.commit()
+
+    counts = DiffSeeder(typed_session, key=["text"], delete=True).seed({
+        "model": "tests.test_diff.Word",
+        "data": [{"text": "Banana"}, {"text": "apple"}, {"text": "date"}],
+    })
+
+    assert counts == {"words": DiffCounts(inserted=1, deleted=1, unchanged=2)}
+
+
+def test_diff_rejects_a_different_key_order_before_writing(typed_session):
+    typed_session.add_all([Word(text="a", rank=1), Word(text="b", rank=2)])
+    typed_session.commit()
+    statements = count_writes(typed_session)
+
+    with pytest.raises(ValueError, match="orders the keys"):
+        DiffSeeder(typed_session, key=["rank"], delete=True, batch_size=1).seed({
+            "model": "tests.test_diff.Word", "data": [{"rank": 0, "text": "z"}],
+        })
+
+    assert statements == ["SELECT"]
+
+
+def test_diff_reseed_of_typed_values_is_unchanged(typed_session):
+    entities = {"model": "tests.test_diff.Price", "data": [
+        {"id": 1, "amount": 0.1, "day": "2024-02-29"},
+        {"id": 2, "amount": "1.005", "day": "2024-03-01"},
+    ]}
+    assert DiffSeeder(typed_session).seed(entities) == {"prices": DiffCounts(inserted=2)}
+    statements = count_writes(typed_session)
+
+    assert DiffSeeder(typed_session).seed(entities) == {"prices": DiffCounts(unchanged=2)}
+    assert statements == ["SELECT"]
@@ -53,6 +53,39 @@ class TestJsonWalker(unittest.TestCase):
         self.walker.backward()
         self.assertEqual(self.walker.json, json['a'])
 
+    def test_backward_does_not_walk_from_root(self):
+        """
+        Test JsonWalker.backward returns the parent kept on the stack
+        """
+
+        json = {'a': [{'b': 'value'}]}
+
+        self.walker.reset(json)
+        self.walker.forward(['a', 0, 'b'])
+        self.walker.root = None  # a re-walk from the root would fail
+        self.assertEqual(self.walker.backward(), json['a'][0])
+        self.assertEqual(self.walker.backward(), json['a'])
+        self.assertEqual(self.walker.backward(), json)
+        self.assertEqual(self.walker.path, [])
+        with self.assertRaises(ValueError):
+            self.walker.backward()
+
+    def test_forward_with_invalid_key_keeps_position(self):
+        """
+        Test JsonWalker.forward leaves the walker unchanged on a missing key
+        """
+
+        json = {'a': {'b': {'c': 'value'}}}
+
+        self.walker.reset(json)
+        self.walker.forward(['a'])
+        with self.assertRaises(KeyError):
+            self.walker.forward(['b', 'missing'])
+        self.assertEqual(self.walker.path, ['a'])
+        self.assertEqual(self.walker.json, json['a'])
+        self.walker.backward()
+        self.assertEqual(self.walker.json, json)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,14 @@
+import json
+import types
 import unittest
 
 import pytest
 
-from sqlalchemyseed import loader
+from sqlalchemyseed import errors, loader
 from sqlalchemyseed import load_entities_from_json
 from sqlalchemyseed import load_entities_from_yaml
 from sqlalchemyseed import load_entities_from_csv
+from sqlalchemyseed import stream_entities_from_json
 
 
 def test_load_path_reads_json(tmp_path):
@@ -38,6 +41,66 @@ def test_discoverable_extensions_are_json_and_yaml():
     assert loader.DISCOVERABLE_EXTENSIONS == {".json", ".yaml", ".yml"}
 
 
+def materialize(entities):
+    return [
+        {**entity, "data": list(entity["data"])} if isinstance(entity.get("data"), types.GeneratorType) else entity
+        for entity in entities
+    ]
+
+
+DOCUMENT = [
+    {"model": "m.A", "data": [
+        {"id": 1234567890123, "price": -12.5e-3, "name": "caf\u00e9 \"x\"", "tags": [True, False, None]},
+        {"id": 7, "!child": {"data": [{"n": 1}, {"n": 22}]}},
+    ]},
+    {"model": "m.B", "data": {"id": 98765}},
+    {"data": [{"id": 1}], "model": "m.C"},
+]
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 5, 8, 13, 1 << 16])
+def test_stream_json_matches_json_load(tmp_path, buffer_size):
+    data_file = tmp_path / "d.json"
+    data_file.write_text(json.dumps(DOCUMENT, indent=1), encoding="utf-8")
+
+    assert materialize(stream_entities_from_json(data_file, buffer_size)) == DOCUMENT
+
+
+def test_stream_json_yields_data_rows_lazily(tmp_path):
+    data_file = tmp_path / "d.json"
+    data_file.write_text(json.dumps({"model": "m.A", "data": [{"id": i} for i in range(3)]}), encoding="utf-8")
+
+    entities = stream_entities_from_json(data_file, buffer_size=4)
+    entity = next(entities)
+
+    assert isinstance(entity["data"], types.GeneratorType)
+    assert next(entity["data"]) == {"id": 0}
+
+
+def test_stream_json_skips_unread_rows(tmp_path):
+    data_file = tmp_path / "d.json"
+    data_file.write_text(json.dumps(DOCUMENT), encoding="utf-8")
+
+    models = [entity["model"] for entity in stream_entities_from_json(data_file, buffer_size=8)]
+
+    assert models == ["m.A", "m.B", "m.C"]
+
+
+@pytest.mark.parametrize("text", ['{"model": "m.A", "data": [1 2]}', '[{"model": "m.A"}', '{} []'])
+def test_stream_json_rejects_invalid_json(tmp_path, text):
+    data_file = tmp_path / "d.json"
+    data_file.write_text(text, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        materialize(stream_entities_from_json(data_file))
+
+
+def test_stream_json_rejects_keys_after_streamed_data(tmp_path):
+    data_file = tmp_path / "d.json"
+    data_file.write_text('{"model": "m.A", "data": [], "filter": {}}', encoding="utf-8")
+    with pytest.raises(errors.InvalidKeyError):
+        materialize(stream_entities_from_json(data_file))
+
+
 class TestLoader(unittest.TestCase):
     def test_load_entities_from_json(self):
         entities = load_entities_from_json('tests/res/data.json')
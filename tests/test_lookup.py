@@ -0,0 +1,351 @@
+"""Tests for the filter lookup cache of HybridSeeder."""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.orm import Session
+
+from sqlalchemyseed import HybridSeeder
+from sqlalchemyseed.lookup import (MISSING, LookupCache, LookupStats, Preloader, batch_lookup, make_key,
+                                   unique_key_sets)
+from tests.models import Base, Company, Employee, Person
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def count_selects(session):
+    statements = []
+    event.listen(
+        session.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def selects(statements):
+    return [s for s in statements if s.startswith("SELECT")]
+
+
+def test_make_key_ignores_kwargs_order():
+    assert make_key(Company, {"id": 1, "name": "Acme"}) == make_key(Company, {"name": "Acme", "id": 1})
+
+
+def test_make_key_of_unhashable_value_is_none():
+    assert make_key(Company, {"name": ["Acme"]}) is None
+
+
+def test_cache_counts_hits_and_misses():
+    cache = LookupCache()
+    assert cache.get("a") is MISSING
+    cache.put("a", None)
+    assert cache.get("a") is None
+
+    assert cache.stats == LookupStats(hits=1, misses=1)
+    cache.clear()
+    assert cache.stats == LookupStats(0, 0)
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LookupCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_cache_of_size_zero_stores_nothing():
+    cache = LookupCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is MISSING
+
+
+def test_hybrid_seeder_repeated_filters_query_once(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+    recorded = count_selects(session)
+
+    seeder = HybridSeeder(session)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [
+            {"name": f"E{i}", "!company": {"filter": {"name": "Acme"}}}
+            for i in range(5)
+        ] + [
+            {"name": f"F{i}", "!company_id": {"filter": {"name": "Acme"}}}
+            for i in range(5)
+        ],
+    })
+    session.commit()
+
+    assert len(selects(recorded)) == 2
+    assert seeder.lookup_stats == LookupStats(hits=8, misses=2)
+    assert {employee.company.name for employee in session.query(Employee)} == {"Acme"}
+
+
+def test_hybrid_seeder_cache_is_scoped_to_a_run(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+    seeder = HybridSeeder(session)
+    entity = {"model": "tests.models.Employee",
+              "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}}}}
+
+    seeder.seed(entity)
+    seeder.seed(entity)
+
+    assert seeder.lookup_stats == LookupStats(hits=0, misses=1)
+
+
+def test_hybrid_seeder_lookup_cache_can_be_disabled(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+    recorded = count_selects(session)
+
+    seeder = HybridSeeder(session, lookup_cache_size=0)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [{"name": f"E{i}", "!company": {"filter": {"name": "Acme"}}} for i in range(3)],
+    })
+
+    assert len(selects(recorded)) == 3
+
+
+def test_batch_lookup_groups_results_by_values(session):
+    session.add_all([Person(name="Alice"), Person(name="Bob"), Person(name="Bob")])
+    session.flush()
+
+    found = batch_lookup(session, Person, ("name",), [("Alice",), ("Bob",), ("Carol",)])
+
+    assert [person.name for person in found[("Alice",)]] == ["Alice"]
+    assert len(found[("Bob",)]) == 2
+    assert ("Carol",) not in found
+
+
+def test_batch_lookup_chunks_by_parameter_limit(session, monkeypatch):
+    session.add_all([Company(name=f"C{i}") for i in range(10)])
+    session.flush()
+    monkeypatch.setattr(session.get_bind().dialect, "insertmanyvalues_max_parameters", 3)
+    statements = count_selects(session)
+
+    found = batch_lookup(session, Company, ("id", "name"), [(i + 1, f"C{i}") for i in range(10)])
+
+    assert len(found) == 10
+    assert len(selects(statements)) == 10  # two columns per value, one value per query
+
+
+def test_hybrid_seeder_batch_filters_query_once_per_target(session):
+    session.add_all([Company(name=f"C{i}") for i in range(20)])
+    session.commit()
+    statements = count_selects(session)
+
+    seeder = HybridSeeder(session, batch_filters=True)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [
+            {"name": f"E{i}", "!company": {"filter": {"name": f"C{i % 20}"}}}
+            for i in range(40)
+        ] + [
+            {"name": f"F{i}", "!company_id": {"filter": {"name": f"C{i}"}}}
+            for i in range(20)
+        ],
+    })
+    session.commit()
+
+    assert len(selects(statements)) == 2
+    assert seeder.lookup_stats == LookupStats(hits=20, misses=40)
+    for employee in session.query(Employee):
+        assert employee.company.name == f"C{int(employee.name[1:]) % 20}"
+
+
+def test_hybrid_seeder_batch_filters_see_rows_of_the_same_run(session):
+    seeder = HybridSeeder(session, batch_filters=True)
+    seeder.seed([
+        {"model": "tests.models.Company", "data": {"name": "Acme"}},
+        {"model": "tests.models.Employee",
+         "data": {"name": "Alice", "!company_id": {"filter": {"name": "Acme"}}}},
+    ])
+    session.commit()
+
+    assert session.query(Employee).one().company.name == "Acme"
+
+
+@pytest.mark.parametrize("names, error", [
+    ([], NoResultFound),
+    (["Alice", "Alice"], MultipleResultsFound),
+])
+def test_hybrid_seeder_batch_filters_keep_errors(session, names, error):
+    session.add_all([Person(name=name) for name in names])
+    session.commit()
+
+    seeder = HybridSeeder(session, batch_filters=True)
+    with pytest.raises(error):
+        seeder.seed({"model": "tests.models.Person", "filter": {"name": "Alice"}})
+
+
+def test_unique_key_sets():
+    assert unique_key_sets(Company) == {frozenset(["name"])}
+    assert unique_key_sets(Employee) == set()
+
+
+def test_preload_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        Preloader("all")
+
+
+@pytest.mark.parametrize("preload", [{"tests.models.Company": ["name"]}, "auto"])
+def test_hybrid_seeder_preload_answers_filters_from_index(session, preload):
+    session.add_all([Company(name=f"C{i}") for i in range(5)])
+    session.commit()
+    statements = count_selects(session)
+
+    seeder = HybridSeeder(session, preload=preload)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [{"name": f"E{i}", "!company": {"filter": {"name": f"C{i}"}}} for i in range(5)],
+    })
+
+    assert len(selects(statements)) == 1  # loading the index
+    assert [employee.company.name for employee in seeder.instances] == [f"C{i}" for i in range(5)]
+
+
+def test_hybrid_seeder_preload_indexes_rows_of_the_run(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+
+    seeder = HybridSeeder(session, preload="auto", batch_filters=True)
+    seeder.seed([
+        {"model": "tests.models.Employee",
+         "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}}}},
+        {"model": "tests.models.Company", "data": {"name": "Initech"}},
+        {"model": "tests.models.Employee",
+         "data": {"name": "Bob", "!company_id": {"filter": {"name": "Initech"}}}},
+    ])
+    session.commit()
+
+    employees = session.query(Employee).order_by(Employee.name).all()
+    assert [employee.company.name for employee in employees] == ["Acme", "Initech"]
+
+
+def test_hybrid_seeder_preload_miss_falls_back_to_query(session):
+    seeder = HybridSeeder(session, preload={Company: ["name"]})
+    with pytest.raises(NoResultFound):
+        seeder.seed({"model": "tests.models.Employee",
+                     "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}}}})
+
+
+def count_flushes(session):
+    flushes = []
+    event.listen(session, "after_flush", lambda *args: flushes.append(True))
+    return flushes
+
+
+def test_hybrid_seeder_column_filters_flush_once_per_pending_table(session):
+    flushes = count_flushes(session)
+
+    HybridSeeder(session, lookup_cache_size=0).seed([
+        {"model": "tests.models.Company", "data": [{"name": f"C{i}"} for i in range(3)]},
+        {"model": "tests.models.Employee", "data": [
+            {"name": f"E{i}", "!company_id": {"filter": {"name": f"C{i % 3}"}}}
+            for i in range(30)
+        ]},
+    ])
+    session.commit()
+
+    assert len(flushes) == 2  # before the first filter, and the commit
+    assert session.query(Employee).filter(Employee.company_id.is_(None)).count() == 0
+
+
+def test_hybrid_seeder_column_filters_flush_changes_made_before_the_run(session):
+    session.add(Company(name="Acme"))
+
+    HybridSeeder(session).seed({
+        "model": "tests.models.Employee",
+        "data": {"name": "Alice", "!company_id": {"filter": {"name": "Acme"}}},
+    })
+
+    assert session.query(Employee).one().company.name == "Acme"
+
+
+def test_hybrid_seeder_primary_key_filter_uses_identity_map(session):
+    company = Company(name="Acme")
+    session.add(company)
+    session.commit()
+    company_id = company.id
+    session.get(Company, company_id)  # load it into the identity map
+    statements = count_selects(session)
+
+    seeder = HybridSeeder(session)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": [
+            {"name": "Alice", "!company": {"filter": {"id": company_id}}},
+            {"name": "Bob", "!company_id": {"filter": {"id": company_id}}},
+        ],
+    })
+
+    assert selects(statements) == []
+    assert seeder.instances[0].company is company
+    assert seeder.instances[1].company_id == company_id
+
+
+def test_hybrid_seeder_primary_key_filter_queries_on_identity_map_miss(session):
+    session.add(Company(id=7, name="Acme"))
+    session.commit()
+    session.expunge_all()
+
+    seeder = HybridSeeder(session)
+    seeder.seed({"model": "tests.models.Employee",
+                 "data": {"name": "Alice", "!company": {"filter": {"id": 7}}}})
+    assert seeder.instances[0].company.name == "Acme"
+
+    with pytest.raises(NoResultFound):
+        seeder.seed({"model": "tests.models.Employee",
+                     "data": {"name": "Bob", "!company": {"filter": {"id": 8}}}})
+
+
+def test_hybrid_seeder_matches_rows_of_the_run_without_flushing(session):
+    flushes = count_flushes(session)
+    statements = count_selects(session)
+
+    seeder = HybridSeeder(session)
+    seeder.seed([
+        {"model": "tests.models.Company", "data": [{"name": "Acme"}, {"name": "Initech"}]},
+        {"model": "tests.models.Employee", "data": [
+            {"name": "Alice", "!company": {"filter": {"name": "Acme"}}},
+            {"name": "Bob", "!company": {"filter": {"name": "Initech"}}},
+        ]},
+    ])
+
+    assert flushes == [] and statements == []
+    assert [employee.company.name for employee in seeder.instances[2:]] == ["Acme", "Initech"]
+
+
+def test_hybrid_seeder_ambiguous_rows_of_the_run_are_queried(session):
+    seeder = HybridSeeder(session)
+    with pytest.raises(MultipleResultsFound):
+        seeder.seed([
+            {"model": "tests.models.Person", "data": [{"name": "Alice"}, {"name": "Alice"}]},
+            {"model": "tests.models.Person", "filter": {"name": "Alice"}},
+        ])
+
+
+def test_hybrid_seeder_rows_of_the_run_by_non_unique_keys_are_queried(session):
+    session.add(Person(name="Alice"))
+    session.commit()
+
+    seeder = HybridSeeder(session)
+    with pytest.raises(MultipleResultsFound):
+        seeder.seed([
+            {"model": "tests.models.Person", "data": {"name": "Alice"}},
+            {"model": "tests.models.Person", "filter": {"name": "Alice"}},
+        ])
@@ -0,0 +1,162 @@
+"""Tests for ParallelSeeder and the component split of entities."""
+
+import threading
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event, select
+from sqlalchemy.orm import Session, declarative_base
+
+from sqlalchemyseed import errors
+from sqlalchemyseed.parallel import ParallelSeeder, find_components
+from tests.models import Base, Child, Company, Employee, Person
+
+COMPANIES = {"model": "tests.models.Company", "data": [{"name": "Acme"}, {"name": "Initech"}]}
+EMPLOYEES = {"model": "tests.models.Employee",
+             "data": {"name": "Alice", "!company": {"data": {"name": "Globex"}}}}
+PERSONS = {"model": "tests.models.Person", "data": [{"name": "Bob"}, {"name": "Carol"}]}
+PARENTS = {"model": "tests.models.Parent",
+           "data": {"name": "Dan", "!children": [{"data": {"name": "Eve"}}]}}
+BROKEN = {"model": "tests.models.Parent", "data": [{"id": 1, "name": "Dan"}, {"id": 1, "name": "Dan"}]}
+
+
+SplitBase = declarative_base()
+
+
+class Note(SplitBase):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Tag(SplitBase):
+    # in another database file, which SQLite locks apart from the main one
+    __tablename__ = "tags"
+    __table_args__ = {"schema": "aux"}
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def names(engine, model):
+    with Session(engine) as session:
+        return sorted(session.scalars(select(model.name)))
+
+
+def test_find_components_groups_tables_linked_by_foreign_keys():
+    components = find_components([COMPANIES, PERSONS, EMPLOYEES, PARENTS])
+
+    assert [component.table_names for component in components] == [
+        ("companies", "employees"),
+        ("persons",),
+        ("children", "parents"),
+    ]
+    assert components[0].entities == [COMPANIES, EMPLOYEES]
+
+
+def test_find_components_ignores_foreign_keys_to_untouched_tables():
+    employees = {"model": "tests.models.Employee", "data": {"name": "Alice"}}
+
+    components = find_components([employees, PERSONS])
+
+    assert [component.table_names for component in components] == [("employees",), ("persons",)]
+
+
+def test_sqlite_seeds_components_on_one_session(engine):
+    seeder = ParallelSeeder(engine, max_workers=4)
+    assert seeder.is_serial
+
+    seeder.seed([COMPANIES, PERSONS, EMPLOYEES, PARENTS])
+
+    assert len(seeder.components) == 3
+    assert names(engine, Company) == ["Acme", "Globex", "Initech"]
+    assert names(engine, Employee) == ["Alice"]
+    assert names(engine, Person) == ["Bob", "Carol"]
+    assert names(engine, Child) == ["Eve"]
+
+
+def test_sqlite_failure_rolls_back_every_component(engine):
+    with pytest.raises(errors.ComponentSeedError) as excinfo:
+        ParallelSeeder(engine).seed([COMPANIES, BROKEN])
+
+    assert list(excinfo.value.failures) == [("parents",)]
+    assert names(engine, Company) == []
+
+
+@pytest.fixture
+def threaded(monkeypatch):
+    """
+    Seed on threads even on SQLite, which allows one writer: only the
+    components of companies write, the others are recorded or fail.
+    """
+    monkeypatch.setattr(ParallelSeeder, "is_serial", property(lambda self: False))
+    sessions = {}
+    seed_component = ParallelSeeder._seed_component
+
+    def record(self, session, component):
+        sessions[component.table_names] = session
+        if component.table_names == ("companies",):
+            seed_component(self, session, component)
+        elif component.table_names == ("parents",):
+            raise ValueError("broken")
+
+    monkeypatch.setattr(ParallelSeeder, "_seed_component", record)
+    return sessions
+
+
+def test_components_are_seeded_on_separate_sessions(engine, threaded):
+    ParallelSeeder(engine, max_workers=2).seed([COMPANIES, PERSONS])
+
+    assert len({id(session) for session in threaded.values()}) == 2
+    assert names(engine, Company) == ["Acme", "Initech"]
+
+
+def test_failure_is_reported_per_component_and_rolls_back(engine, threaded):
+    with pytest.raises(errors.ComponentSeedError) as excinfo:
+        ParallelSeeder(engine, max_workers=2).seed([COMPANIES, PERSONS, BROKEN])
+
+    assert list(excinfo.value.failures) == [("parents",)]
+    assert "broken" in str(excinfo.value)
+    assert names(engine, Company) == []
+
+
+@pytest.fixture
+def split_engine(tmp_path):
+    """Tables in two SQLite files, so two sessions can write at once."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute(
+        f"ATTACH DATABASE '{tmp_path / 'aux.db'}' AS aux"
+    ))
+    SplitBase.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_components_are_seeded_concurrently_on_threads(split_engine, monkeypatch):
+    monkeypatch.setattr(ParallelSeeder, "is_serial", property(lambda self: False))
+    # both components wait for each other before writing, so they overlap
+    barrier = threading.Barrier(2, timeout=10)
+    threads = set()
+    seed_component = ParallelSeeder._seed_component
+
+    def concurrently(self, session, component):
+        threads.add(threading.get_ident())
+        barrier.wait()
+        seed_component(self, session, component)
+
+    monkeypatch.setattr(ParallelSeeder, "_seed_component", concurrently)
+    seeder = ParallelSeeder(split_engine, max_workers=2)
+    seeder.seed([
+        {"model": "tests.test_parallel.Note", "data": [{"name": "first"}, {"name": "second"}]},
+        {"model": "tests.test_parallel.Tag", "data": {"name": "urgent"}},
+    ])
+
+    assert len(seeder.components) == 2 and len(threads) == 2
+    assert names(split_engine, Note) == ["first", "second"]
+    assert names(split_engine, Tag) == ["urgent"]
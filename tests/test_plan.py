@@ -0,0 +1,71 @@
+"""Tests for compiled seed plans."""
+
+import pytest
+
+from sqlalchemyseed import Seeder, errors
+from sqlalchemyseed._future import compile_plan
+from sqlalchemyseed.plan import get_plan
+from tests.models import Child, Company, Employee, GrandChild, Parent
+
+
+def test_get_plan_splits_columns_and_references():
+    plan = get_plan(Company, ("name", "!employees"), "!")
+
+    assert plan.column_keys == ("name",)
+    assert plan.misplaced_keys == ()
+    (reference,) = plan.references
+    assert reference.attr_name == "employees"
+    assert reference.target_class is Employee
+    assert reference.uselist is True
+
+
+def test_get_plan_is_cached_per_class_and_key_shape():
+    assert get_plan(Employee, ("name", "!company"), "!") is \
+        get_plan(Employee, ("name", "!company"), "!")
+    assert get_plan(Employee, ("name",), "!") is not \
+        get_plan(Employee, ("name", "!company"), "!")
+
+
+def test_get_plan_reference_to_foreign_key_column():
+    (reference,) = get_plan(Employee, ("!company_id",), "!").references
+
+    assert reference.is_relationship is False
+    assert reference.uselist is False
+    assert reference.target_class is Company
+
+
+def test_plan_kwargs_drops_misplaced_relationship_key():
+    plan = get_plan(Company, ("name", "employees"), "!")
+    row = {"name": "Acme", "employees": []}
+
+    with pytest.warns(UserWarning, match="did you mean !employees"):
+        assert plan.kwargs(row) == {"name": "Acme"}
+    with pytest.raises(errors.InvalidKeyError):
+        plan.kwargs(row, strict=True)
+
+
+def test_compile_plan_collects_nested_shapes():
+    plans = compile_plan({
+        "model": "tests.models.Parent",
+        "data": [
+            {"name": "p1", "!children": [{"data": {"name": "c1"}}]},
+            {"name": "p2", "!children": [{"data": [{"name": "c2"}, {"name": "c3"}]}]},
+        ],
+    })
+
+    assert set(plans) == {(Parent, ("name", "!children")), (Child, ("name",))}
+
+
+def test_seeder_keeps_siblings_of_a_nested_parent():
+    seeder = Seeder()
+    seeder.seed({
+        "model": "tests.models.Parent",
+        "data": {"name": "p", "!children": [{"data": [
+            {"name": "c1", "!children": [{"data": {"name": "g"}}]},
+            {"name": "c2"},
+        ]}]},
+    }, add_to_session=False)
+
+    (parent,) = seeder.instances
+    assert [child.name for child in parent.children] == ["c1", "c2"]
+    assert isinstance(parent.children[0].children[0], GrandChild)
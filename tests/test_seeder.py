@@ -1,12 +1,12 @@
 import unittest
 from typing import List
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, select
 from sqlalchemy.orm import sessionmaker
 
 from sqlalchemyseed import HybridSeeder, Seeder, errors
 from tests import instances as ins
-from tests.models import Base, Company
+from tests.models import Base, Company, Employee
 from tests.relationships import association_object, many_to_many, many_to_one, one_to_many, one_to_one
 
 
@@ -594,3 +594,57 @@ class TestSeederCostumizedPrefix(unittest.TestCase):
             seeder.seed(custom_instance)
             employee = seeder.instances[1]
             self.assertIsNotNone(employee.company)
+
+
+class TestSeederFlushEvery(unittest.TestCase):
+    """
+    Tests Seeder.seed with flush_every, which flushes and expunges in chunks.
+    """
+
+    def setUp(self) -> None:
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.entities = {
+            'model': 'tests.models.Company',
+            'data': [
+                {'name': f'Company {i}', '!employees': [{'data': {'name': f'Employee {i}'}}]}
+                for i in range(7)
+            ],
+        }
+
+    def tearDown(self) -> None:
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_flush_every_keeps_only_counters(self):
+        flushes = []
+        event.listen(self.session, 'after_flush', lambda *args: flushes.append(1))
+
+        seeder = Seeder(self.session)
+        seeder.seed(self.entities, flush_every=3)
+
+        self.assertEqual(len(flushes), 3)
+        self.assertEqual(seeder.instances, ())
+        self.assertEqual(seeder.instance_count, 7)
+        self.assertEqual(len(self.session.identity_map), 0)
+        self.session.commit()
+        self.assertEqual(self.session.scalar(select(func.count(Employee.id))), 7)
+
+    def test_flush_every_without_expunge(self):
+        seeder = Seeder(self.session)
+        seeder.seed(self.entities, flush_every=5, expunge=False)
+
+        self.assertEqual(seeder.instance_count, 7)
+        self.assertEqual(len(self.session.new), 0)
+        self.assertEqual(len(self.session.identity_map), 14)
+
+    def test_flush_every_requires_add_to_session(self):
+        with self.assertRaises(ValueError):
+            Seeder(self.session).seed(self.entities, add_to_session=False, flush_every=2)
+
+    def test_instance_count_without_flush_every(self):
+        seeder = Seeder(self.session)
+        seeder.seed(self.entities)
+        self.assertEqual(seeder.instance_count, 7)
+        self.assertEqual(len(seeder.instances), 7)
@@ -0,0 +1,119 @@
+"""Tests for seeding lazy iterables of entities and rows."""
+
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from sqlalchemyseed import Seeder, errors, stream_entities_from_json
+from tests.models import Base, Company, Employee, Person
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def count(session, model):
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_seed_generator_rows(session):
+    rows = ({"name": f"Person {i}"} for i in range(5))
+
+    seeder = Seeder(session)
+    seeder.seed({"model": "tests.models.Person", "data": rows})
+    session.commit()
+
+    assert seeder.instance_count == 5
+    assert count(session, Person) == 5
+
+
+def test_seed_csv_reader_rows(session):
+    reader = csv.DictReader(io.StringIO("name\nAcme\nInitech\n"))
+
+    Seeder(session).seed({"model": "tests.models.Company", "data": reader})
+
+    assert sorted(company.name for company in session.new) == ["Acme", "Initech"]
+
+
+def test_seed_generator_of_entities_with_nested_rows(session):
+    def entities():
+        yield {"model": "tests.models.Person", "data": {"name": "Alice"}}
+        yield {
+            "model": "tests.models.Company",
+            "data": ({"name": f"C{i}", "!employees": [{"data": {"name": f"E{i}"}}]}
+                     for i in range(3)),
+        }
+
+    seeder = Seeder(session)
+    seeder.seed(entities())
+    session.commit()
+
+    assert seeder.instance_count == 4
+    assert count(session, Company) == 3
+    assert count(session, Employee) == 3
+
+
+def test_seed_stream_is_consumed_lazily(session):
+    consumed = []
+
+    def rows():
+        for i in range(10):
+            consumed.append(i)
+            yield {"name": f"Person {i}"}
+
+    inserted_when = []
+    seeder = Seeder(session, mode="bulk", batch_size=4)
+    original = session.execute
+
+    def execute(statement, params=None, **kwargs):
+        inserted_when.append(len(consumed))
+        return original(statement, params, **kwargs)
+
+    session.execute = execute
+    seeder.seed({"model": "tests.models.Person", "data": rows()})
+
+    assert inserted_when == [4, 8, 10]
+    assert seeder.row_counts == {"persons": 10}
+
+
+def test_seed_stream_validates_each_row(session):
+    rows = iter([{"name": "Alice"}, "not a dict"])
+
+    with pytest.raises(errors.InvalidTypeError):
+        Seeder(session).seed({"model": "tests.models.Person", "data": rows})
+    assert len(session.new) == 0
+
+
+def test_seed_empty_stream_is_invalid(session):
+    with pytest.raises(errors.EmptyDataError):
+        Seeder(session).seed({"model": "tests.models.Person", "data": iter([])})
+
+
+def test_seed_stream_entity_requires_model(session):
+    with pytest.raises(errors.MissingKeyError):
+        Seeder(session).seed({"data": iter([{"name": "Alice"}])})
+
+
+@pytest.mark.parametrize("kwargs", [{"mode": "bulk", "batch_size": 2}, {}])
+def test_seed_streamed_json_file(session, tmp_path, kwargs):
+    data_file = tmp_path / "companies.json"
+    data_file.write_text(json.dumps([
+        {"model": "tests.models.Company", "data": [
+            {"name": f"C{i}", "!employees": [{"data": {"name": f"E{i}"}}]} for i in range(5)
+        ]},
+        {"model": "tests.models.Person", "data": [{"name": f"P{i}"} for i in range(3)]},
+    ]), encoding="utf-8")
+
+    Seeder(session, **kwargs).seed(stream_entities_from_json(data_file, buffer_size=16), flush_every=2)
+    session.commit()
+
+    assert (count(session, Company), count(session, Employee), count(session, Person)) == (5, 5, 3)
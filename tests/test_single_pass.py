@@ -0,0 +1,98 @@
+"""Tests for single-pass validation and seeding."""
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from sqlalchemyseed import HybridSeeder, Seeder, errors
+from tests.models import Base, Company, Employee
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def count(session, model):
+    return session.scalar(select(func.count()).select_from(model))
+
+
+COMPANY = {
+    "model": "tests.models.Company",
+    "data": {"name": "Acme", "!employees": [{"data": [{"name": "Alice"}, {"name": "Bob"}]}]},
+}
+
+
+@pytest.mark.parametrize("mode", ["orm", "bulk"])
+def test_seeder_single_pass(session, mode):
+    seeder = Seeder(session, mode=mode)
+    seeder.seed(COMPANY, single_pass=True)
+    session.commit()
+
+    assert count(session, Company) == 1
+    assert count(session, Employee) == 2
+
+
+@pytest.mark.parametrize("mode", ["orm", "bulk"])
+def test_seeder_single_pass_rolls_back_invalid_reference(session, mode):
+    entities = [
+        {"model": "tests.models.Company", "data": {"name": "Acme"}},
+        {"model": "tests.models.Company",
+         "data": {"name": "Initech", "!employees": [{"data": "Alice"}]}},
+    ]
+
+    with pytest.raises(errors.InvalidTypeError):
+        Seeder(session, mode=mode).seed(entities, single_pass=True)
+
+    assert len(session.new) == 0
+    assert count(session, Company) == 0
+
+
+def test_seeder_single_pass_raises_same_errors(session):
+    entity = {"model": "tests.models.Company", "data": {"name": "Acme"}, "filter": {}}
+
+    with pytest.raises(errors.MaxLengthExceededError):
+        Seeder(session).seed(entity)
+    with pytest.raises(errors.MaxLengthExceededError):
+        Seeder(session).seed(entity, single_pass=True)
+
+
+def test_seeder_single_pass_accepts_empty_entity(session):
+    seeder = Seeder(session)
+    seeder.seed({}, single_pass=True)
+    seeder.seed({})
+
+    assert seeder.instances == ()
+
+
+def test_hybrid_seeder_single_pass(session):
+    session.add(Company(name="Acme"))
+    session.commit()
+
+    seeder = HybridSeeder(session)
+    seeder.seed({
+        "model": "tests.models.Employee",
+        "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}}},
+    }, single_pass=True)
+    session.commit()
+
+    employee = session.scalars(select(Employee)).one()
+    assert employee.company.name == "Acme"
+
+
+def test_hybrid_seeder_single_pass_rolls_back_invalid_reference(session):
+    entities = [
+        {"model": "tests.models.Company", "data": {"name": "Acme"}},
+        {"model": "tests.models.Employee",
+         "data": {"name": "Alice", "!company": {"filter": {"name": "Acme"}, "data": {}}}},
+    ]
+
+    with pytest.raises(errors.MaxLengthExceededError):
+        HybridSeeder(session).seed(entities, single_pass=True)
+
+    assert len(session.new) == 0
+    assert count(session, Company) == 0
@@ -1,8 +1,9 @@
+import sys
 import unittest
 from sqlalchemyseed import validator
 
 from src.sqlalchemyseed import errors
-from src.sqlalchemyseed.validator import SchemaValidator, Key, hybrid_validate, validate
+from src.sqlalchemyseed.validator import SchemaValidator, Key, get_validator, hybrid_validate, validate
 from tests import instances as ins
 
 
@@ -95,6 +96,25 @@ class TestSchemaValidator(unittest.TestCase):
         self.assertIsNone(hybrid_validate(
             ins.PARENT_TO_CHILDREN_WITH_MULTI_DATA_WITHOUT_MODEL))
 
+    def test_deeply_nested_references(self):
+        entity = {'model': 'tests.models.Company', 'data': {'name': 'leaf'}}
+        for _ in range(sys.getrecursionlimit() * 2):
+            entity = {'model': 'tests.models.Company', 'data': {'name': 'node', '!child': entity}}
+        self.assertIsNone(validate(entity))
+
+    def test_first_error_in_document_order(self):
+        entity = {'model': 'tests.models.Company', 'data': [
+            {'name': 'a', '!employees': {'data': 'not a dict'}},
+            'not a dict either',
+        ]}
+        with self.assertRaises(errors.InvalidTypeError) as context:
+            validate(entity)
+        self.assertIn("either 'dict' or 'list'", str(context.exception))
+
+    def test_get_validator_is_cached(self):
+        self.assertIs(get_validator((Key.data(),), '!'), get_validator((Key.data(),), '!'))
+        self.assertIsNot(get_validator((Key.data(),), '!'), get_validator((Key.data(),), '@'))
+
 
 class TestKey(unittest.TestCase):
     def test_key_equal_key(self):